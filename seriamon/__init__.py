@@ -3,6 +3,12 @@ SeriaMon
 
 SeriaMon (Serial Monitor) is a simple serial data monitor with GUI.
 """
-from seriamon.seriamon import SeriaMon
 
 __all__ = ['SeriaMon']
+
+def __getattr__(name):
+    # import the GUI (and guiqwt) only when it is used
+    if name == 'SeriaMon':
+        from seriamon.seriamon import SeriaMon
+        return SeriaMon
+    raise AttributeError("module 'seriamon' has no attribute '{}'".format(name))
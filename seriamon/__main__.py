@@ -1,4 +1,20 @@
-from seriamon import *
+import argparse
 
 if __name__ == '__main__':
-    SeriaMon().run()
+    parser = argparse.ArgumentParser(prog='seriamon', description='SeriaMon (Serial Monitor)')
+    parser.add_argument('--config', metavar='FILE',
+                        help='preferences file (default: ~/.seriamon.cfg)')
+    parser.add_argument('--headless', action='store_true',
+                        help='capture ports to log files without GUI')
+    parser.add_argument('--log', metavar='FILE',
+                        help='log file name in headless mode, strftime() format is accepted')
+    parser.add_argument('--echo', action='store_true',
+                        help='print captured lines to stdout in headless mode')
+    args = parser.parse_args()
+
+    if args.headless:
+        from seriamon.headless import SeriaMonHeadless
+        SeriaMonHeadless(args.config, args.log, args.echo).run()
+    else:
+        from seriamon.seriamon import SeriaMon
+        SeriaMon(args.config).run()
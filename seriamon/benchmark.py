@@ -0,0 +1,250 @@
+"""
+End-to-end throughput benchmark
+
+Synthetic ports push generated traffic through PortFilter, mainWindow and
+the TextViewer, Plotter and Logger. The offered rate is doubled at every step
+until the pipeline cannot keep up with it.
+
+    (venv) $ python -m seriamon.benchmark --ports 2 --lines 2000 --output bench.json
+    (venv) $ python -m seriamon.benchmark --baseline bench.json
+"""
+import sys
+import os
+import json
+import random
+import argparse
+import tempfile
+import time
+from PyQt5.QtWidgets import QApplication
+from PyQt5 import QtCore
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from .component import *
+from .filter import PortFilter
+from .router import EventRouter
+from .seriamon import mainWindow
+from .stats import PipelineStats
+from .utils import Util
+
+class SyntheticPort(SeriaMonPort):
+    """
+       a port which emits generated lines at the given rate
+    """
+    component_default_name = 'Synthetic'
+
+    def __init__(self, sink, instanceId=0, lineLength=80, noiseRatio=0.0, plot=False, chunkSize=1000):
+        super().__init__(sink=sink, instanceId=instanceId)
+        self.rate = 0
+        self.sent = 0
+        self.chunkSize = chunkSize
+        self.types = 'p' if plot else None
+        self.pool = self._makeLines(lineLength, noiseRatio, plot)
+        self.thread = _GeneratorThread(self)
+
+    def start(self, rate):
+        self.rate = rate
+        if not self.thread.isRunning():
+            self.thread.start()
+
+    def shutdown(self):
+        self.thread.stayAlive = False
+        self.thread.wait()
+
+    def _makeLines(self, lineLength, noiseRatio, plot):
+        rand = random.Random(self.instanceId)
+        lines = []
+        for i in range(256):
+            if plot:
+                line = ' '.join([ 'ch{}:{:.3f}'.format(c, rand.uniform(-100, 100)) for c in range(4) ])
+                line = line.encode()
+            else:
+                line = bytearray(rand.choice(b'abcdefghijklmnopqrstuvwxyz0123456789 ') for x in range(lineLength))
+                for x in range(lineLength):
+                    if rand.random() < noiseRatio:
+                        line[x] = rand.randrange(0x80, 0x100)
+                line = bytes(line)
+            lines.append(line + b'\r\n')
+        return lines
+
+
+class _GeneratorThread(QtCore.QThread):
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+        self.stayAlive = True
+
+    def run(self):
+        self.thread_context = Util.thread_context(f'{self.parent.getComponentName()}')
+        parent = self.parent
+        pool = parent.pool
+        start = time.monotonic()
+        rate = parent.rate
+        due = 0
+        while self.stayAlive:
+            if rate != parent.rate:
+                start = time.monotonic()
+                rate = parent.rate
+                due = 0
+            lines = int(rate * (time.monotonic() - start)) - due
+            due += lines
+            chunk = bytearray()
+            for i in range(lines):
+                chunk += pool[(parent.sent + i) % len(pool)]
+                if parent.chunkSize <= len(chunk):
+                    parent.sink.putLog(bytes(chunk), parent.compId, parent.types)
+                    chunk = bytearray()
+            if 0 < len(chunk):
+                parent.sink.putLog(bytes(chunk), parent.compId, parent.types)
+            parent.sent += lines
+            self.msleep(10)
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.ports = []
+        self.steps = []
+        self.window = None
+        self.delivered = 0
+
+    def run(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = QApplication([])
+
+        args = self.args
+        for i in range(args.ports):
+            filter = PortFilter(sink=None)
+            port = SyntheticPort(sink=filter, instanceId=i, lineLength=args.line_length,
+                                 noiseRatio=args.noise, plot=(i < args.plot_ports), chunkSize=args.chunk_size)
+            filter.setSource(port)
+            self.ports.append(port)
+
+        prefFilename = os.path.join(tempfile.mkdtemp(prefix='seriamon-bench-'), 'seriamon.cfg')
+        self.window = mainWindow(prefFilename, loadPlugins=False)
+        self.window.log_level = SeriaMonComponent.LOG_WARNING
+        EventRouter.getInstance().subscribe(self._count, compIds=[ port.compId for port in self.ports ])
+        for port in self.ports:
+            port.sink.setSink(self.window)
+
+        PipelineStats.enable()
+        rate = args.lines
+        while rate <= args.max_lines:
+            step = self._step(app, rate)
+            self.steps.append(step)
+            print('{:>10.0f} lines/s offered, {:>10.0f} delivered, {:6.1f} us cpu/line, p99 {} ms, {} KB'.format(
+                step['offered'], step['delivered'], step['cpu_us_per_line'] or 0,
+                step['render_p99_ms'], step['peak_rss_kb']))
+            if not step['sustained']:
+                break
+            rate *= 2
+
+        for port in self.ports:
+            port.shutdown()
+        return self._result()
+
+    def _step(self, app, rate):
+        for port in self.ports:
+            port.start(rate)
+        # let the pipeline settle before measuring
+        self._spin(app, 0.5)
+        delivered = self.delivered
+        cpu = time.process_time()
+        start = time.monotonic()
+        PipelineStats.reset()
+        self._spin(app, self.args.duration)
+        elapsed = time.monotonic() - start
+        cpu = time.process_time() - cpu
+        delivered = self.delivered - delivered
+        offered = rate * len(self.ports)
+        p99 = PipelineStats.snapshot()['stages']['render']['p99']
+        return { 'offered': offered,
+                 'delivered': delivered / elapsed,
+                 'cpu_us_per_line': cpu / delivered * 1e6 if delivered else None,
+                 'render_p99_ms': p99,
+                 'peak_rss_kb': self._peakRss(),
+                 'sustained': delivered / elapsed >= offered * 0.95 and p99 is not None and p99 < 1000 }
+
+    def _count(self, batch):
+        self.delivered += len(batch)
+
+    def _spin(self, app, seconds):
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            app.processEvents(QtCore.QEventLoop.AllEvents, 50)
+            time.sleep(0.001)
+
+    def _peakRss(self):
+        if resource is None:
+            return None
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            rss //= 1024
+        return rss
+
+    def _result(self):
+        args = self.args
+        sustained = [ step for step in self.steps if step['sustained'] ]
+        best = sustained[-1] if sustained else None
+        return { 'config': { 'ports': args.ports, 'lines': args.lines, 'line_length': args.line_length,
+                             'noise': args.noise, 'plot_ports': args.plot_ports,
+                             'chunk_size': args.chunk_size, 'duration': args.duration },
+                 'steps': self.steps,
+                 'summary': { 'saturation_lines_per_sec': best['offered'] if best else 0,
+                              'sustained_lines_per_sec': best['delivered'] if best else 0,
+                              'cpu_us_per_line': best['cpu_us_per_line'] if best else None,
+                              'peak_rss_kb': self._peakRss() } }
+
+
+def compare(result, baseline, tolerance):
+    """
+       returns a list of regressions against the baseline
+    """
+    regressions = []
+    current = result['summary']
+    base = baseline['summary']
+    if current['sustained_lines_per_sec'] < base['sustained_lines_per_sec'] * (1.0 - tolerance):
+        regressions.append('sustained lines/s {:.0f} < {:.0f}'.format(
+            current['sustained_lines_per_sec'], base['sustained_lines_per_sec']))
+    if current['cpu_us_per_line'] and base['cpu_us_per_line'] and \
+       base['cpu_us_per_line'] * (1.0 + tolerance) < current['cpu_us_per_line']:
+        regressions.append('cpu/line {:.1f} us > {:.1f} us'.format(
+            current['cpu_us_per_line'], base['cpu_us_per_line']))
+    if current['peak_rss_kb'] and base['peak_rss_kb'] and \
+       base['peak_rss_kb'] * (1.0 + tolerance) < current['peak_rss_kb']:
+        regressions.append('peak RSS {} KB > {} KB'.format(current['peak_rss_kb'], base['peak_rss_kb']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m seriamon.benchmark',
+                                     description='SeriaMon end-to-end throughput benchmark')
+    parser.add_argument('--ports', type=int, default=1, help='number of synthetic ports')
+    parser.add_argument('--lines', type=int, default=1000, help='lines/s of each port at the first step')
+    parser.add_argument('--max-lines', type=int, default=1000000, help='upper limit of lines/s of each port')
+    parser.add_argument('--line-length', type=int, default=80, help='characters per line')
+    parser.add_argument('--noise', type=float, default=0.0, help='ratio of undecodable bytes')
+    parser.add_argument('--plot-ports', type=int, default=0, help='number of ports emitting plot lines')
+    parser.add_argument('--chunk-size', type=int, default=1000, help='bytes per read from a port')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds to measure each step')
+    parser.add_argument('--output', metavar='FILE', help='save the result as JSON')
+    parser.add_argument('--baseline', metavar='FILE', help='compare the result with a saved JSON')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='acceptable regression ratio')
+    args = parser.parse_args()
+
+    result = Benchmark(args).run()
+    print(json.dumps(result['summary'], indent=1))
+    if args.output:
+        with open(args.output, 'w') as writer:
+            json.dump(result, writer, indent=1)
+    if args.baseline:
+        with open(args.baseline, 'r') as reader:
+            regressions = compare(result, json.load(reader), args.tolerance)
+        for regression in regressions:
+            print('REGRESSION: {}'.format(regression))
+        if regressions:
+            sys.exit(1)
+    sys.exit(0)
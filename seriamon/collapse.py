@@ -0,0 +1,61 @@
+from .event import LogEvent
+
+class Run:
+    """
+       consecutive identical lines of a port
+    """
+    __slots__ = ('value', 'compId', 'types', 'count', 'first', 'last', 'ref')
+
+    def __init__(self, event, ref=None):
+        self.value = event.value
+        self.compId = event.compId
+        self.types = event.types
+        self.count = 1
+        self.first = event.ns
+        self.last = event.ns
+        self.ref = ref
+
+    def annotation(self) -> str:
+        first = LogEvent.toDatetime(self.first).time().isoformat(timespec='milliseconds')
+        last = LogEvent.toDatetime(self.last).time().isoformat(timespec='milliseconds')
+        return 'repeated {} times ({}..{})'.format(self.count, first, last)
+
+
+class RepeatCollapser:
+    """
+       detects consecutive identical lines of each port, ignoring timestamps
+    """
+    def __init__(self):
+        self.runs = {}
+
+    def collapse(self, event, ref=None):
+        """
+           returns (run, ended)
+             run is the run of the port if the event was folded into it,
+             otherwise None and a new run which refers to ref starts
+             ended is the previous run of the port if the event ended it after repeats
+        """
+        run = self.runs.get(event.compId)
+        if run is not None and run.value == event.value and run.types == event.types:
+            run.count += 1
+            run.last = event.ns
+            return (run, None)
+        self.runs[event.compId] = Run(event, ref)
+        if run is not None and 1 < run.count:
+            return (None, run)
+        return (None, None)
+
+    def forget(self, first):
+        """
+           ends runs which refer to something older than first without reporting them
+        """
+        for compId in [ compId for compId, run in self.runs.items() if run.ref is not None and run.ref < first ]:
+            del self.runs[compId]
+
+    def end(self):
+        """
+           ends all runs, returns those which have repeats
+        """
+        runs = [ run for run in self.runs.values() if 1 < run.count ]
+        self.runs = {}
+        return runs
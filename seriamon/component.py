@@ -76,9 +76,16 @@ class SeriaMonComponent:
     def setSink(self, sink):
         self.sink = sink
 
+    def putLogBatch(self, log):
+        """
+           deliver a batch of LogEvents at once
+           components which only implement putLog() get them one by one
+        """
+        for event in log:
+            self.putLog(event.value, event.compId, event.types, event.timestamp)
+
     def importLog(self, log):
-        for value, compId, types, timestamp in log:
-            self.putLog(value, compId=compId, types=types, timestamp=timestamp)
+        self.putLogBatch(log)
 
     def savePreferences(self, prefs):
         if not self.preferencePoperties:
@@ -250,7 +257,7 @@ class ComponentManager(SeriaMonComponent):
         return self._components
 
     def callAllComponentsMethod(self, method_name: str, excludes = None):
-        if not isinstance(excludes, SeriaMonComponent):
+        if not isinstance(excludes, list):
             excludes = [ excludes ]
         for comp in self._components:
             if comp is self or comp in excludes:
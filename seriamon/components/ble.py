@@ -8,15 +8,13 @@ from PyQt5 import QtCore
 from PyQt5.QtCore import QVariant
 from PyQt5.QtGui import QTextCursor
 
-from bleak import BleakScanner
-from bleak import BleakClient
-
 from seriamon.component import SeriaMonPort
 from seriamon.utils import *
 
 __devices__ = {}
 __instances__ = [ None, None, None, None ]
 __handlers__ = [ None, None, None, None ]
+__scan__ = False
 
 log = Util.log
 
@@ -26,6 +24,16 @@ def detection_handler(device, advertisement_data):
         log("new decice: ", device.address, device.name)
         __devices__[str(device)] = device
 
+def request_scan():
+    # bleak is imported and the scanner is started when the device list is opened
+    # or a device is connected by any instance at first
+    global __scan__
+    __scan__ = True
+
+def scan_requested():
+    global __scan__
+    return __scan__
+
 def notification_handler(self, sender, data):
     funcs = [ "DC", "AC", "DC", "AC", "Ohm", "Cap", "Hz", "Duty" , "Temp", "Temp", "Diode", "Cont", "hFE", "", "", "" ]
     units = [ "V",  "V",  "A",  "A",  "Ohm", "F",   "Hz", "%" ,    "℃",     "℉",     "V",     "Ohm",        "hFE", "", "", "" ]
@@ -121,9 +129,12 @@ class Component(QWidget, SeriaMonPort):
         self.deviceComboBox.setEnabled(not self.connect)
         self.plotCheckBox.setEnabled(not self.connect)
         self.connectButton.setText('Disconnect' if self.connect else 'Connect')
+        if self.connect:
+            request_scan()
         self.generation += 1
 
     def _updateDevices(self):
+        request_scan()
         currentText = self.deviceComboBox.currentText()
         self.deviceComboBox.clear()
         if currentText is not None and currentText != '' and not currentText in self.devices.keys():
@@ -152,15 +163,21 @@ class _ReaderThread(QtCore.QThread):
         parent = self.parent
         error = False
         prevStatus = parent.STATUS_NONE
-        scanncer = None
+        scanner = None
         client = None
 
-        if parent.instanceId == 0:
-            scanner = BleakScanner()
-            scanner.register_detection_callback(detection_handler)
-            await scanner.start()
-
         while self.stayAlive:
+            if scanner is None and parent.instanceId == 0 and scan_requested():
+                try:
+                    from bleak import BleakScanner
+                except ImportError as e:
+                    parent.log(parent.LOG_ERROR, e)
+                    parent.setStatus(parent.STATUS_ERROR)
+                    break
+                scanner = BleakScanner()
+                scanner.register_detection_callback(detection_handler)
+                await scanner.start()
+
             """try to (re)connect the device if
                  device sellection has been changed
                  connect / disconnect button was clicked
@@ -176,6 +193,7 @@ class _ReaderThread(QtCore.QThread):
                         parent.log(parent.LOG_DEBUG, 'waiting for {}...'.format(parent.device))
                     else:
                         parent.log(parent.LOG_DEBUG, "connecting to {}...".format(parent.devices[parent.device]))
+                        from bleak import BleakClient
                         client = BleakClient(parent.devices[parent.device].address, loop=loop)
                         await client.connect()
                         if parent.plot:
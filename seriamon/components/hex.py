@@ -0,0 +1,265 @@
+from PyQt5.QtWidgets import *
+from PyQt5.QtGui import QPainter
+from PyQt5 import QtCore
+
+from seriamon.component import *
+from seriamon.filter import PortFilter
+from seriamon.router import EventRouter
+from seriamon.utils import ComboBox
+
+class ByteLog:
+    """
+       raw bytes of a port in one contiguous bytearray
+
+       base is the stream offset of the first retained byte. When capacity is
+       exceeded the head is dropped in steps of an eighth of the capacity,
+       always by whole rows so the rows keep their offsets.
+    """
+    def __init__(self, capacity, bytesPerRow=16):
+        self.capacity = capacity
+        self.bytesPerRow = bytesPerRow
+        self.data = bytearray()
+        self.base = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def end(self) -> int:
+        return self.base + len(self.data)
+
+    def append(self, chunk) -> int:
+        """
+           returns how many rows were dropped from the head
+        """
+        self.data += chunk
+        if len(self.data) <= self.capacity:
+            return 0
+        drop = len(self.data) - self.capacity + self.capacity // 8
+        drop -= drop % self.bytesPerRow
+        drop = max(drop, self.bytesPerRow)
+        del self.data[ : drop]
+        self.base += drop
+        return drop // self.bytesPerRow
+
+
+class HexView(QAbstractScrollArea):
+    """
+       offset, hex and ASCII columns of a ByteLog, only visible rows are formatted
+    """
+    MARGIN = 4
+    ASCII = bytes([ c if 0x20 <= c < 0x7f else ord('.') for c in range(256) ])
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+        self.autoScroll = True
+
+        font = self.viewport().font()
+        font.setFamily("Courier New")
+        self.viewport().setFont(font)
+        self.verticalScrollBar().setSingleStep(1)
+
+    def setModel(self, model):
+        self.model = model
+        self.updateRows()
+
+    def rowCount(self) -> int:
+        if self.model is None:
+            return 0
+        return (len(self.model) + self.model.bytesPerRow - 1) // self.model.bytesPerRow
+
+    def pageRows(self) -> int:
+        return max(1, self.viewport().height() // self.viewport().fontMetrics().lineSpacing())
+
+    def rowsChanged(self, removed):
+        scrollbar = self.verticalScrollBar()
+        value = scrollbar.value() - removed
+        self.updateRows()
+        if removed and not self.autoScroll:
+            scrollbar.setValue(max(0, value))
+
+    def updateRows(self):
+        page = self.pageRows()
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setRange(0, max(0, self.rowCount() - page))
+        scrollbar.setPageStep(page)
+        if self.autoScroll:
+            scrollbar.setValue(scrollbar.maximum())
+        width = len(self.formatRow(0)) * self.viewport().fontMetrics().horizontalAdvance('0') + self.MARGIN * 2
+        scrollbar = self.horizontalScrollBar()
+        scrollbar.setRange(0, max(0, width - self.viewport().width()))
+        scrollbar.setPageStep(self.viewport().width())
+        self.viewport().update()
+
+    def formatRow(self, row) -> str:
+        if self.model is None:
+            return ''
+        bytesPerRow = self.model.bytesPerRow
+        half = bytesPerRow // 2
+        start = row * bytesPerRow
+        chunk = bytes(self.model.data[start : start + bytesPerRow])
+        hexes = chunk[ : half].hex(' ') + '  ' + chunk[half : ].hex(' ')
+        return '{:08x}  {:<{}}  |{}|'.format(self.model.base + start, hexes, bytesPerRow * 3 + 1,
+                                             chunk.translate(self.ASCII).decode('ascii'))
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.viewport().fontMetrics()
+        height = metrics.lineSpacing()
+        painter.setPen(self.viewport().palette().text().color())
+        x = self.MARGIN - self.horizontalScrollBar().value()
+        top = self.verticalScrollBar().value()
+        rows = self.rowCount()
+        for i in range(self.pageRows() + 1):
+            if rows <= top + i:
+                break
+            painter.drawText(x, i * height + metrics.ascent(), self.formatRow(top + i))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.updateRows()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+
+class Component(QWidget, SeriaMonComponent):
+
+    component_default_name = 'Hex'
+    component_default_num_of_instances = 1
+
+    def __init__(self, sink, instanceId=0):
+        super().__init__(sink=sink, instanceId=instanceId)
+
+        self.logs = {}
+
+        self.portComboBox = ComboBox()
+        self.portComboBox.aboutToBeShown.connect(self._updatePorts)
+        self.portComboBox.currentIndexChanged.connect(self._selectPort)
+
+        self.binaryCheckBox = QCheckBox('capture as binary')
+        self.binaryCheckBox.clicked.connect(self._onBinaryClicked)
+
+        self.autoScrollCheckBox = QCheckBox('auto scroll')
+        self.autoScrollCheckBox.setChecked(True)
+        self.autoScrollCheckBox.stateChanged.connect(self._onAutoScrollChanged)
+
+        self.clearButton = QPushButton('clear')
+        self.clearButton.clicked.connect(self.clearLog)
+
+        self.view = HexView()
+
+        self.initPreferences('seriamon.hex.{}.'.format(instanceId),
+                             [[ str,    'binary_ports', '',     None ],  # port names separated by ','
+                              [ int,    'capacity',     16,     None ],  # megabytes per port
+                              [ bool,   'auto_scroll',  True,   self.autoScrollCheckBox ]])
+
+        topLayout = QHBoxLayout()
+        topLayout.addWidget(QLabel('port:'))
+        topLayout.addWidget(self.portComboBox)
+        topLayout.addWidget(self.binaryCheckBox)
+        topLayout.addWidget(self.autoScrollCheckBox)
+        topLayout.addWidget(self.clearButton)
+        topLayout.addStretch()
+
+        layout = QVBoxLayout()
+        layout.addLayout(topLayout)
+        layout.addWidget(self.view)
+        self.setLayout(layout)
+
+        self.subscription = None
+
+    def setupWidget(self):
+        # only the main window shows the view, nobody would see the bytes in headless mode
+        if self.subscription is None:
+            self.subscription = EventRouter.getInstance().subscribe(self._putBinary, types='b')
+        return self
+
+    def updatePreferences(self):
+        super().updatePreferences()
+        self.view.autoScroll = self.auto_scroll
+        binaryPorts = self._getBinaryPorts()
+        for port in self._getPorts():
+            if isinstance(port.sink, PortFilter):
+                port.sink.setBinary(port.getComponentName() in binaryPorts, self)
+        self._updatePorts()
+
+    def clearLog(self):
+        self.logs = {}
+        self.view.setModel(None)
+        self._selectPort()
+
+    def showEvent(self, event):
+        self._updatePorts()
+        super().showEvent(event)
+
+    def _getPorts(self):
+        return [ comp for comp in ComponentManager.get_instance().getComponents() if isinstance(comp, SeriaMonPort) ]
+
+    def _getBinaryPorts(self):
+        """
+           returns the names of the binary ports, compIds change when the set of plugins changes
+        """
+        return set([ name.strip() for name in self.binary_ports.split(',') if name.strip() ])
+
+    def _getPortName(self, compId):
+        for port in self._getPorts():
+            if port.getComponentId() == compId:
+                return port.getComponentName()
+        return None
+
+    def _updatePorts(self):
+        compId = self.portComboBox.currentData()
+        self.portComboBox.blockSignals(True)
+        self.portComboBox.clear()
+        for port in self._getPorts():
+            self.portComboBox.addItem('{:2d} {}'.format(port.getComponentId(), port.getComponentName()),
+                                      port.getComponentId())
+        index = self.portComboBox.findData(compId)
+        self.portComboBox.setCurrentIndex(max(0, index))
+        self.portComboBox.blockSignals(False)
+        self._selectPort()
+
+    def _selectPort(self):
+        compId = self.portComboBox.currentData()
+        self.binaryCheckBox.setEnabled(compId is not None)
+        self.binaryCheckBox.setChecked(self._getPortName(compId) in self._getBinaryPorts())
+        self.view.setModel(self.logs.get(compId))
+
+    def _onBinaryClicked(self):
+        compId = self.portComboBox.currentData()
+        if compId is None:
+            return
+        binaryPorts = self._getBinaryPorts()
+        if self.binaryCheckBox.isChecked():
+            binaryPorts.add(self._getPortName(compId))
+        else:
+            binaryPorts.discard(self._getPortName(compId))
+        self.binary_ports = ','.join(sorted(binaryPorts))
+        self.updatePreferences()
+
+    def _onAutoScrollChanged(self):
+        self.reflectFromUi()
+        self.view.autoScroll = self.auto_scroll
+        self.view.updateRows()
+
+    def _putBinary(self, batch):
+        removed = 0
+        selected = self.portComboBox.currentData()
+        for event in batch:
+            value = event.value
+            if isinstance(value, str):
+                # imported from a log file, see Logger._write()
+                try:
+                    value = bytes.fromhex(value)
+                except ValueError:
+                    continue
+            log = self.logs.get(event.compId)
+            if log is None:
+                log = self.logs[event.compId] = ByteLog(max(1, self.capacity) * 1024 * 1024)
+                if event.compId == selected:
+                    self.view.setModel(log)
+            dropped = log.append(value)
+            if event.compId == selected:
+                removed += dropped
+        self.view.rowsChanged(removed)
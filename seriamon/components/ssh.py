@@ -1,11 +1,10 @@
 import asyncio
-import asyncssh
+import importlib
 import queue
 import traceback
 from PyQt5.QtWidgets import *
 from PyQt5 import QtCore
 from PyQt5.QtCore import QVariant
-from asyncssh.misc import ConnectionLost
 
 from seriamon.component import *
 from seriamon.utils import *
@@ -121,6 +120,9 @@ class _Thread(QtCore.QThread):
         self.conn = None
         self.proc = None
         self.delay = None
+        # asyncssh is imported when the port is connected at first
+        self.asyncssh = None
+        self.ConnectionLost = ConnectionAbortedError
 
     def run(self):
         self.thread_context = Util.thread_context(f'{self.parent.getComponentName()}')
@@ -173,7 +175,10 @@ class _Thread(QtCore.QThread):
                     await asyncio.sleep(delay)
                 if parent.connect:
                     try:
-                        self.conn = await asyncssh.connect(parent.host, port=22,
+                        if self.asyncssh is None:
+                            self.asyncssh = importlib.import_module('asyncssh')
+                            self.ConnectionLost = importlib.import_module('asyncssh.misc').ConnectionLost
+                        self.conn = await self.asyncssh.connect(parent.host, port=22,
                                 username=parent.user, password=parent.password,
                                 client_keys=None,  known_hosts=None)
                         self.proc = await self.conn.create_process(parent.command)
@@ -217,7 +222,7 @@ class _Thread(QtCore.QThread):
                     else:
                         await asyncio.sleep(1.0)
                 except Exception as e:
-                    if isinstance(e, ConnectionLost) or isinstance(e, ConnectionAbortedError):
+                    if isinstance(e, self.ConnectionLost) or isinstance(e, ConnectionAbortedError):
                         parent.log(parent.LOG_DEBUG, e)
                         self.delay = 1.0
                     else:
@@ -253,7 +258,7 @@ class _Thread(QtCore.QThread):
                     parent.sink.putLog(value, parent.compId, self.types)
                     self.error = False
                 except Exception as e:
-                    if isinstance(e, ConnectionLost) or isinstance(e, ConnectionAbortedError):
+                    if isinstance(e, self.ConnectionLost) or isinstance(e, ConnectionAbortedError):
                         parent.log(parent.LOG_DEBUG, e)
                         self.delay = 1.0
                     else:
@@ -0,0 +1,72 @@
+from PyQt5.QtWidgets import *
+from PyQt5 import QtCore
+
+from seriamon.component import *
+from seriamon.stats import PipelineStats
+
+class Component(QWidget, SeriaMonComponent):
+
+    component_default_name = 'Stats'
+    component_default_num_of_instances = 1
+
+    def __init__(self, sink, instanceId=0):
+        super().__init__(sink=sink, instanceId=instanceId)
+
+        self.collecting = False
+
+        self.textEdit = QPlainTextEdit()
+        self.textEdit.setReadOnly(True)
+        doc = self.textEdit.document()
+        font = doc.defaultFont()
+        font.setFamily("Courier New")
+        doc.setDefaultFont(font)
+        width = self.textEdit.fontMetrics().boundingRect('_' * 64).width()
+        self.textEdit.setMinimumWidth(width)
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._refresh)
+
+        layout = QVBoxLayout()
+        layout.addWidget(self.textEdit)
+        self.setLayout(layout)
+
+    def setupWidget(self):
+        return self
+
+    def showEvent(self, event):
+        # collect statistics only while the tab is shown
+        if not self.collecting:
+            self.collecting = True
+            PipelineStats.enable()
+            self.timer.start(1000)
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        if self.collecting:
+            self.collecting = False
+            self.timer.stop()
+            PipelineStats.disable()
+        super().hideEvent(event)
+
+    def _refresh(self):
+        stats = PipelineStats.snapshot()
+        names = {}
+        for comp in ComponentManager.get_instance().getComponents():
+            if isinstance(comp, SeriaMonPort):
+                names[comp.getComponentId()] = comp.getComponentName()
+
+        def ms(value):
+            return '{:9.3f}'.format(value) if value is not None else '{:>9}'.format('-')
+
+        lines = [ '{:<8} {:>8} {:>9} {:>9} {:>9}'.format('stage', 'count', 'p50 ms', 'p99 ms', 'max ms') ]
+        for stage in PipelineStats.STAGES:
+            s = stats['stages'][stage]
+            lines.append('{:<8} {:>8} {} {} {}'.format(stage, s['count'], ms(s['p50']), ms(s['p99']), ms(s['max'])))
+        lines.append('')
+        lines.append('queue depth: {} (max {})'.format(stats['queue']['depth'], stats['queue']['max']))
+        lines.append('')
+        lines.append('{:<24} {:>12} {:>12}'.format('port', 'bytes/s', 'lines/s'))
+        for compId, s in sorted(stats['ports'].items(), key=lambda item: str(item[0])):
+            name = '{:2} {}'.format(compId, names.get(compId, ''))
+            lines.append('{:<24} {:>12.1f} {:>12.1f}'.format(name, s['bytes/s'], s['lines/s']))
+        self.textEdit.setPlainText('\n'.join(lines))
@@ -1,5 +1,4 @@
 import serial
-import serial.tools.list_ports
 import queue
 from PyQt5.QtWidgets import *
 from PyQt5 import QtCore
@@ -178,6 +177,7 @@ class Component(QWidget, SeriaMonPort):
         self.generation += 1
 
     def _updatePortnames(self):
+        import serial.tools.list_ports
         currentText = self.portnameComboBox.currentText()
         portnames = [v[0] for v in serial.tools.list_ports.comports(include_links=True)]
         self.portnameComboBox.clear()
@@ -0,0 +1,231 @@
+from operator import itemgetter
+
+import numpy as np
+
+class CurveBuffer:
+    """
+       x and y samples of a curve in preallocated float64 rings
+
+       Every sample is stored twice, at i and i + capacity, so the retained
+       samples are always contiguous in the arrays and view() hands them out
+       without copying. That costs 32 bytes per sample instead of 16, but
+       decimate() searches and slices the samples on every frame without
+       joining the two halves of a ring.
+    """
+    def __init__(self, capacity):
+        self._allocate(max(1, capacity))
+
+    def __len__(self):
+        return self._length
+
+    def getCapacity(self) -> int:
+        return self.capacity
+
+    def append(self, x, y):
+        head = self._head
+        self._x[head] = self._x[head + self.capacity] = x
+        self._y[head] = self._y[head + self.capacity] = y
+        self._head = (head + 1) % self.capacity
+        if self._length < self.capacity:
+            self._length += 1
+
+    def extend(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.float64)[-self.capacity : ]
+        ys = np.asarray(ys, dtype=np.float64)[-self.capacity : ]
+        n = len(xs)
+        if n == 0:
+            return
+        head = self._head
+        first = min(n, self.capacity - head)
+        rest = n - first
+        for (buffer, values) in ((self._x, xs), (self._y, ys)):
+            buffer[head : head + first] = values[ : first]
+            buffer[head + self.capacity : head + self.capacity + first] = values[ : first]
+            buffer[ : rest] = values[first : ]
+            buffer[self.capacity : self.capacity + rest] = values[first : ]
+        self._head = (head + n) % self.capacity
+        self._length = min(self._length + n, self.capacity)
+
+    def view(self):
+        """
+           returns (x, y), views of the retained samples from the oldest one
+           they are overwritten by later appends, copy them to keep them
+        """
+        start = (self._head - self._length) % self.capacity
+        end = start + self._length
+        return (self._x[start : end], self._y[start : end])
+
+    def setCapacity(self, capacity):
+        capacity = max(1, capacity)
+        if capacity == self.capacity:
+            return
+        (x, y) = self.view()
+        (x, y) = (x.copy(), y.copy())
+        self._allocate(capacity)
+        self.extend(x, y)
+
+    def clear(self):
+        self._head = 0
+        self._length = 0
+
+    def _allocate(self, capacity):
+        self.capacity = capacity
+        self._x = np.empty(capacity * 2, dtype=np.float64)
+        self._y = np.empty(capacity * 2, dtype=np.float64)
+        self.clear()
+
+
+def minmax(buckets, size):
+    """
+       merges every size buckets of (xa, ymin, xb, ymax) into one
+         ymin and ymax are the extremes of a bucket, xa and xb their x
+         samples are buckets of themselves, (x, y, x, y)
+       the last bucket may merge fewer
+    """
+    (xa, ymin, xb, ymax) = buckets
+    n = len(xa) // size * size
+    parts = []
+    if n:
+        (xa2, ymin2, xb2, ymax2) = [ column[ : n].reshape(-1, size) for column in buckets ]
+        rows = np.arange(len(xa2))
+        low = ymin2.argmin(axis=1)
+        high = ymax2.argmax(axis=1)
+        parts.append((xa2[rows, low], ymin2[rows, low], xb2[rows, high], ymax2[rows, high]))
+    if n < len(xa):
+        low = n + int(ymin[n : ].argmin())
+        high = n + int(ymax[n : ].argmax())
+        parts.append((xa[low : low + 1], ymin[low : low + 1], xb[high : high + 1], ymax[high : high + 1]))
+    if len(parts) == 0:
+        return tuple([ column[ : 0] for column in buckets ])
+    if len(parts) == 1:
+        return parts[0]
+    return tuple([ np.concatenate(columns) for columns in zip(*parts) ])
+
+def interleave(buckets):
+    """
+       returns (x, y) of the minimum and the maximum of each bucket in the order of x
+    """
+    (xa, ymin, xb, ymax) = buckets
+    swap = xb < xa
+    xs = np.empty(len(xa) * 2, dtype=np.float64)
+    ys = np.empty(len(xa) * 2, dtype=np.float64)
+    xs[0::2] = np.where(swap, xb, xa)
+    ys[0::2] = np.where(swap, ymax, ymin)
+    xs[1::2] = np.where(swap, xa, xb)
+    ys[1::2] = np.where(swap, ymin, ymax)
+    return (xs, ys)
+
+
+class MinMaxPyramid:
+    """
+       samples of a curve and min/max summaries of them at coarser levels
+
+       A bucket of level k covers FACTOR ** k samples and keeps its minimum
+       and maximum with their x. Buckets are completed as samples arrive, so
+       decimate() reads only the level which matches the requested resolution
+       and a zoomed out view never walks the raw samples. Spikes survive
+       because every bucket keeps its extremes.
+    """
+    FACTOR = 8
+
+    def __init__(self, capacity):
+        self.samples = CurveBuffer(capacity)
+        self._allocate()
+
+    def __len__(self):
+        return len(self.samples)
+
+    def getCapacity(self) -> int:
+        return self.samples.getCapacity()
+
+    def view(self):
+        return self.samples.view()
+
+    def append(self, x, y):
+        self.samples.append(x, y)
+        bucket = (x, y, x, y)
+        for level, (mins, maxs) in enumerate(self._levels):
+            pending = self._pending[level]
+            pending.append(bucket)
+            if len(pending) < self.FACTOR:
+                return
+            low = min(pending, key=itemgetter(1))
+            high = max(pending, key=itemgetter(3))
+            bucket = (low[0], low[1], high[2], high[3])
+            self._pending[level] = []
+            mins.append(bucket[0], bucket[1])
+            maxs.append(bucket[2], bucket[3])
+
+    def extend(self, xs, ys):
+        if len(xs) < self.FACTOR:
+            # cheaper than arrays for a few samples
+            for (x, y) in zip(xs, ys):
+                self.append(float(x), float(y))
+            return
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        self.samples.extend(xs, ys)
+        self._aggregate(xs, ys)
+
+    def decimate(self, x0, x1, width):
+        """
+           returns (x, y) of the samples between x0 and x1, reduced to at most
+           2 * width pairs of min and max if there are more samples than that
+           one sample on each side is included so that lines reach the edges
+           the arrays are new ones, they may be kept while samples are appended
+        """
+        (x, y) = self.samples.view()
+        start = max(0, int(np.searchsorted(x, x0)) - 1)
+        end = min(len(x), int(np.searchsorted(x, x1, 'right')) + 1)
+        level = 0
+        while level < len(self._levels) and 2 * width < (end - start) / self.FACTOR ** level:
+            level += 1
+        if level == 0:
+            return (x[start : end].copy(), y[start : end].copy())
+
+        (mins, maxs) = self._levels[level - 1]
+        (xa, ymin) = mins.view()
+        (xb, ymax) = maxs.view()
+        start = max(0, int(np.searchsorted(xa, x0)) - 1)
+        end = int(np.searchsorted(xa, x1, 'right')) + 1
+        parts = [ (xa[start : end], ymin[start : end], xb[start : end], ymax[start : end]) ]
+        # samples which have not completed a bucket of this level yet
+        for pending in reversed(self._pending[ : level]):
+            if pending:
+                parts.append(np.array(pending, dtype=np.float64).T)
+        return interleave([ np.concatenate(columns) for columns in zip(*parts) ])
+
+    def setCapacity(self, capacity):
+        if max(1, capacity) == self.getCapacity():
+            return
+        self.samples.setCapacity(capacity)
+        (x, y) = [ samples.copy() for samples in self.samples.view() ]
+        self._allocate()
+        self._aggregate(x, y)
+
+    def clear(self):
+        self.samples.clear()
+        self._allocate()
+
+    def _allocate(self):
+        self._levels = []
+        size = self.samples.getCapacity() // self.FACTOR
+        while 2 <= size:
+            self._levels.append((CurveBuffer(size + 1), CurveBuffer(size + 1)))
+            size //= self.FACTOR
+        self._pending = [ [] for level in self._levels ]
+
+    def _aggregate(self, xs, ys):
+        buckets = (xs, ys, xs, ys)
+        for level, (mins, maxs) in enumerate(self._levels):
+            pending = self._pending[level]
+            if pending:
+                buckets = [ np.concatenate((head, tail))
+                            for head, tail in zip(np.array(pending, dtype=np.float64).T, buckets) ]
+            n = len(buckets[0]) // self.FACTOR * self.FACTOR
+            self._pending[level] = list(zip(*[ column[n : ].tolist() for column in buckets ]))
+            if n == 0:
+                return
+            buckets = minmax([ column[ : n] for column in buckets ], self.FACTOR)
+            mins.extend(buckets[0], buckets[1])
+            maxs.extend(buckets[2], buckets[3])
@@ -0,0 +1,43 @@
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+class LogEvent(namedtuple('LogEvent', ['value', 'compId', 'types', 'ns'])):
+    """
+       an immutable log line which travels from the ports to the display sinks
+
+       ns is time.monotonic_ns() when the data was received, so events from
+       different ports are ordered exactly. It is converted to wall-clock time
+       with an anchor taken once per session.
+    """
+    __slots__ = ()
+
+    _wallclock = datetime.now()
+    _monotonic = time.monotonic_ns()
+
+    @staticmethod
+    def now() -> int:
+        return time.monotonic_ns()
+
+    @staticmethod
+    def toDatetime(ns: int) -> datetime:
+        return LogEvent._wallclock + timedelta(microseconds=(ns - LogEvent._monotonic) // 1000)
+
+    @staticmethod
+    def fromDatetime(timestamp: datetime) -> int:
+        return LogEvent._monotonic + (timestamp - LogEvent._wallclock) // timedelta(microseconds=1) * 1000
+
+    @staticmethod
+    def toNs(timestamp=None) -> int:
+        """
+           accepts None (now), monotonic nanoseconds or datetime
+        """
+        if timestamp is None:
+            return time.monotonic_ns()
+        if isinstance(timestamp, datetime):
+            return LogEvent.fromDatetime(timestamp)
+        return timestamp
+
+    @property
+    def timestamp(self) -> datetime:
+        return LogEvent.toDatetime(self.ns)
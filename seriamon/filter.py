@@ -2,10 +2,11 @@ import threading
 import time
 import re
 import traceback
-from datetime import datetime
 from typing import Dict
 from PyQt5 import QtCore
 from .component import SeriaMonComponent
+from .event import LogEvent
+from .stats import PipelineStats
 from .utils import Util
 
 class FilterHook:
@@ -28,6 +29,8 @@ class PortFilter(SeriaMonComponent):
         self._source = None
         self._remain = None
         self._hooks = []
+        self._binary = False
+        self._binaryOwners = set()
 
     def setSource(self, source):
         self._source = source
@@ -43,11 +46,35 @@ class PortFilter(SeriaMonComponent):
     def isConnected(self):
         return self.getStatus() == SeriaMonComponent.STATUS_ACTIVE
 
+    def setBinary(self, binary, owner=None):
+        """
+           pass raw chunks through as 'b' events instead of decoding and splitting them into lines
+           the port stays binary while any owner wants it
+        """
+        with self._condvar:
+            if binary:
+                self._binaryOwners.add(owner)
+            else:
+                self._binaryOwners.discard(owner)
+            binary = 0 < len(self._binaryOwners)
+            if binary and self._remain:
+                self._handleLine(self._remain, self.remain_compId, self.remain_types, self.remain_ts)
+                self._remain = None
+            self._binary = binary
+
+    def isBinary(self):
+        return self._binary
+
     def putLog(self, value, compId=None, types=None, timestamp=None):
         if len(value) == 0:
             return
-        if timestamp is None:
-            timestamp = datetime.now()
+        timestamp = LogEvent.toNs(timestamp)
+        if self._binary and isinstance(value, (bytes, bytearray)):
+            if PipelineStats.enabled:
+                PipelineStats.addRead(compId, len(value), 0)
+                PipelineStats.addLatency('filter', LogEvent.now() - timestamp)
+            self.sink.putLog(bytes(value), compId, 'b', timestamp)
+            return
         with self._condvar:
             value = Util.decode(value).strip('\r')
             if self._remain:
@@ -57,6 +84,9 @@ class PortFilter(SeriaMonComponent):
             else:
                 remain_ts = None
             lines = value.split('\n')
+            if PipelineStats.enabled:
+                PipelineStats.addRead(compId, len(value), len(lines) - 1)
+                PipelineStats.addLatency('filter', LogEvent.now() - timestamp)
             for i in lines[0:-1]:
                 if remain_ts:
                     self._handleLine(i, compId, types, remain_ts)
@@ -162,7 +192,7 @@ class PortFilter(SeriaMonComponent):
     def _update(self):
         if self._source:
             self.setStatus(self._source.getStatus())
-        if self._remain and self.remain_ts < Util.before_seconds(1):
+        if self._remain and self.remain_ts < LogEvent.now() - 1000000000:
             self.flush()
 
 
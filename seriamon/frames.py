@@ -0,0 +1,124 @@
+import numpy as np
+
+class FrameDecoder:
+    """
+       decodes fixed size binary frames of samples
+
+       A frame is the sync word, an optional timestamp in microseconds and
+       one sample of each channel, all little-endian. Frames are located by
+       the sync word and read with numpy.frombuffer() as a structured array,
+       so a read of thousands of frames costs a few numpy calls. Bytes which
+       were skipped to find the sync word again are counted in dropped.
+
+       Without a timestamp field the frames of a read are spread evenly
+       between the time of the previous read and the time of this one.
+    """
+    DTYPES = ('int16', 'uint16', 'int32', 'uint32', 'float32', 'float64', 'int8', 'uint8')
+    TIMESTAMPS = ('none', 'uint32', 'uint64')
+
+    def __init__(self, sync, channels, dtype='int16', timestamp='none'):
+        """
+           sync is the sync word in hex, raises ValueError if the layout is invalid
+        """
+        if channels < 1 or dtype not in self.DTYPES or timestamp not in self.TIMESTAMPS:
+            raise ValueError('invalid frame layout: {} {} {}'.format(channels, dtype, timestamp))
+        self.sync = bytes.fromhex(sync)
+        self.channels = channels
+        self.dtype = dtype
+        self.timestamp = timestamp
+        self.names = (None, ) * channels
+
+        fields = []
+        if self.sync:
+            fields.append(('sync', 'u1', (len(self.sync), )))
+        if timestamp != 'none':
+            fields.append(('timestamp', np.dtype(timestamp).newbyteorder('<')))
+        fields.append(('values', np.dtype(dtype).newbyteorder('<'), (channels, )))
+        self._frame = np.dtype(fields)
+        self._sync = np.frombuffer(self.sync, dtype=np.uint8)
+        self.reset()
+
+    @staticmethod
+    def fromString(spec):
+        """
+           spec is 'sync,channels,dtype,timestamp' as returned by toString()
+        """
+        try:
+            (sync, channels, dtype, timestamp) = spec.split(',')
+            return FrameDecoder(sync, int(channels), dtype, timestamp)
+        except (TypeError, ValueError):
+            raise ValueError('invalid frame layout: {}'.format(spec))
+
+    def toString(self) -> str:
+        return '{},{},{},{}'.format(self.sync.hex(), self.channels, self.dtype, self.timestamp)
+
+    def getFrameSize(self) -> int:
+        return self._frame.itemsize
+
+    def reset(self):
+        self.dropped = 0
+        self._remain = b''
+        self._lastNs = None
+        self._lastTimestamp = None
+        self._origin = None
+
+    def decode(self, chunk, ns):
+        """
+           returns (ns, values) of the frames completed by chunk, None if there is none
+             ns is an array of the times of the frames
+             values is an array of shape (frames, channels)
+        """
+        data = self._remain + bytes(chunk)
+        size = self._frame.itemsize
+        frames = []
+        pos = 0
+        start = 0
+        while True:
+            if self.sync:
+                found = data.find(self.sync, start)
+                if found < 0:
+                    keep = max(pos, len(data) - len(self.sync) + 1)
+                    self.dropped += keep - pos
+                    pos = keep
+                    break
+                self.dropped += found - pos
+                pos = found
+            count = (len(data) - pos) // size
+            if count == 0:
+                break
+            array = np.frombuffer(data, dtype=self._frame, count=count, offset=pos)
+            if self.sync:
+                bad = np.flatnonzero((array['sync'] != self._sync).any(axis=1))
+                if len(bad):
+                    # lost sync, look for the sync word after the broken frame
+                    frames.append(array[ : bad[0]])
+                    pos += int(bad[0]) * size
+                    start = pos + 1
+                    continue
+            frames.append(array)
+            pos += count * size
+            break
+        self._remain = data[pos : ]
+
+        frames = [ array for array in frames if len(array) ]
+        if not frames:
+            return None
+        frames = np.concatenate(frames) if 1 < len(frames) else frames[0]
+        return (self._times(frames, ns), frames['values'].astype(np.float64))
+
+    def _times(self, frames, ns):
+        if self.timestamp == 'none':
+            last = ns if self._lastNs is None else self._lastNs
+            self._lastNs = ns
+            return last + (ns - last) * np.arange(1, len(frames) + 1, dtype=np.float64) / len(frames)
+
+        timestamps = frames['timestamp'].astype(np.int64)
+        if self._lastTimestamp is None:
+            self._lastTimestamp = int(timestamps[0])
+            self._origin = ns - self._lastTimestamp * 1000
+        steps = np.diff(timestamps, prepend=self._lastTimestamp)
+        if self.timestamp == 'uint32':
+            steps %= 1 << 32  # wraps around every 71 minutes
+        timestamps = self._lastTimestamp + np.cumsum(steps)
+        self._lastTimestamp = int(timestamps[-1])
+        return self._origin + timestamps * 1000.0
@@ -1,6 +1,6 @@
 import abc
 import threading
-from typing import List
+from typing import Callable, Dict, List
 
 class SeriaMonGpioInterface(metaclass=abc.ABCMeta):
     @abc.abstractmethod
@@ -19,14 +19,34 @@ class SeriaMonGpioInterface(metaclass=abc.ABCMeta):
 class GpioManager:
     _lock = threading.Lock()
     _classes: List[SeriaMonGpioInterface] = []
+    _loaders: Dict[str, Callable] = {}
 
     def register(name, obj) -> None:
         with GpioManager._lock:
             GpioManager._classes.append(obj)
 
+    @staticmethod
+    def register_loader(name, loader: Callable) -> None:
+        '''
+        register a class which is imported by loader() when the devices are listed at first
+        '''
+        with GpioManager._lock:
+            GpioManager._loaders[name] = loader
+
+    @staticmethod
+    def get_classes() -> list:
+        with GpioManager._lock:
+            loaders = GpioManager._loaders
+            GpioManager._loaders = {}
+        for name, loader in loaders.items():
+            obj = loader()
+            if obj is not None:
+                GpioManager.register(name, obj)
+        return GpioManager._classes
+
     @staticmethod
     def get_list() -> list:
         devices = []
-        for cls in GpioManager._classes:
+        for cls in GpioManager.get_classes():
             devices.extend(cls.get_list())
         return devices
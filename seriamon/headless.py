@@ -0,0 +1,151 @@
+import sys
+import os
+import signal
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5 import QtCore
+
+from .component import *
+from .event import LogEvent
+from .logger import Logger
+from .plugins import PluginLoader
+from .preferences_dialog import PreferencesDialog
+from .ringbuffer import RingBuffer
+from .router import EventRouter
+from .stats import PipelineStats
+from .utils import Util
+
+class HeadlessMonitor(QtCore.QObject, SeriaMonComponent):
+    """
+       capture ports to log files without the main window, text viewer and plotter
+
+       Ports, scripts and the logger are configured by the preferences file
+       saved by the GUI.
+    """
+    def __init__(self, prefFilename=None, logFilename=None, echo=False):
+        self.compmgr = ComponentManager.get_instance()
+        super().__init__(sink=self)
+        self.compmgr.setSink(self)
+
+        self.setComponentName(None)
+        Util.set_logger(self)
+
+        """
+           initialize properties
+        """
+        if prefFilename is None:
+            prefFilename = os.path.join(os.path.expanduser('~'), '.seriamon.cfg')
+        self.prefFilename = prefFilename
+        self.echo = echo
+        self.MAXQUEUESIZE = 10000
+        self.queue = RingBuffer(self.MAXQUEUESIZE, Preferences.getInstance().queue_policy)
+        self.stopped = False
+
+        """
+           create components
+        """
+        # load global preferences at first and load all preferences later again
+        self.prefencesDialog = PreferencesDialog(sink=self,
+                                                 updateAllComponentPreferences = lambda: self.compmgr.updatePreferences())
+        self.compmgr.loadPreferences(self.prefFilename)
+        self.log_level = Preferences.getInstance().default_log_level
+        self.compmgr.updatePreferences()
+
+        PluginLoader.loadGpioClasses(self)
+        PluginLoader.loadComponents(self)
+
+        self.logger = Logger(sink=self)
+        self.logger.interactive = False
+
+        self.router = EventRouter.getInstance()
+        self.router.subscribe(self.logger)
+        if echo:
+            self.router.subscribe(self._echo)
+
+        """
+           load preferennces
+        """
+        self.compmgr.loadPreferences(self.prefFilename)
+        if logFilename:
+            self.logger.foldername = os.path.dirname(os.path.abspath(logFilename))
+            self.logger.filename = os.path.basename(logFilename)
+            self.logger.doWrite = True
+            self.logger.reflectToUi()
+        self.compmgr.updatePreferences()
+
+        """
+           now we are ready
+        """
+        self.timer = QtCore.QTimer(self)
+        self.timer.timeout.connect(self._handler)
+        self.timer.start(int(1000 / max(1, Preferences.getInstance().refresh_rate)))
+        self.compmgr.callAllComponentsMethod('initialized')
+
+    def putLog(self, value, compId=None, types=None, timestamp=None):
+        if self.stopped:
+            return
+        if compId is None:
+            compId = '?'
+        if types is None:
+            types = ''
+        event = LogEvent(value, compId, types, LogEvent.toNs(timestamp))
+        self.queue.put(event, compId)
+        if PipelineStats.enabled:
+            PipelineStats.addLatency('enqueue', LogEvent.now() - event.ns)
+
+    def getQueueCounters(self):
+        return self.queue.getCounters()
+
+    def updatePreferences(self):
+        super().updatePreferences()
+        self.queue.setPolicy(Preferences.getInstance().queue_policy)
+
+    def shutdown(self):
+        self.compmgr.callAllComponentsMethod('shutdown', excludes=self)
+        self._handler()
+        self.logger.doWrite = False
+        self.logger._reopen()
+
+    def _handler(self):
+        if PipelineStats.enabled:
+            PipelineStats.setQueueDepth(self.queue.qsize())
+        batch = []
+        while not self.queue.empty():
+            batch.append(self.queue.get())
+        if len(batch) == 0:
+            return
+        if PipelineStats.enabled:
+            PipelineStats.addLatencies('dequeue', LogEvent.now(), batch)
+        self.router.dispatch(batch)
+        if PipelineStats.enabled:
+            PipelineStats.addLatencies('render', LogEvent.now(), batch)
+
+    def _echo(self, batch):
+        for event in batch:
+            if 'i' in event.types:
+                # internal messages have been printed by log()
+                continue
+            value = event.value
+            if isinstance(value, str):
+                value = value.rstrip('\n\r')
+            elif isinstance(value, (bytes, bytearray)):
+                value = value.hex(' ')
+            print('{} {:>2} {}'.format(event.timestamp, event.compId, value))
+
+
+class SeriaMonHeadless:
+    def __init__(self, prefFilename=None, logFilename=None, echo=False):
+        self.prefFilename = prefFilename
+        self.logFilename = logFilename
+        self.echo = echo
+
+    def run(self):
+        # components are widgets which hold their own settings, they are never shown
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        app = QApplication([])
+        monitor = HeadlessMonitor(self.prefFilename, self.logFilename, self.echo)
+        signal.signal(signal.SIGINT, lambda signum, frame: app.quit())
+        signal.signal(signal.SIGTERM, lambda signum, frame: app.quit())
+        status = app.exec_()
+        monitor.shutdown()
+        sys.exit(status)
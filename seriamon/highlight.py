@@ -0,0 +1,96 @@
+import re
+from collections import OrderedDict
+
+_globalFlags = re.compile(r'\(\?([aiLmsux]+)\)')
+_backreference = re.compile(r'\\[1-9]')
+
+class Highlighter:
+    """
+       highlight rules compiled into one regex, evaluated only for painted lines
+
+       A rule is (pattern, colour, bold). Rules are tried in order at each
+       position, the first one which matches wins. Spans of a line are cached
+       by its sequence number, so a line is matched once while it is on or
+       near the screen and lines which are never painted cost nothing.
+
+       Rules which can not be combined, e.g. with numbered backreferences or
+       duplicated group names, make the rules be matched one at a time.
+    """
+    CACHE = 4096
+
+    def __init__(self):
+        self.pattern = None
+        self.rules = []
+        self.formats = {}
+        self.cache = OrderedDict()
+
+    def setRules(self, rules):
+        """
+           returns patterns which could not be compiled, they are ignored
+        """
+        self.cache.clear()
+        groups = []
+        invalids = []
+        separate = False
+        self.rules = []
+        self.formats = {}
+        for (pattern, color, bold) in rules:
+            if not pattern:
+                continue
+            # leading global flags are only allowed at the start of the combined pattern
+            match = _globalFlags.match(pattern)
+            scoped = pattern
+            if match:
+                scoped = '(?{}:{})'.format(match.group(1), pattern[match.end() : ])
+            try:
+                regex = re.compile(scoped)
+            except re.error:
+                invalids.append(pattern)
+                continue
+            pattern = scoped
+            if _backreference.search(pattern):
+                separate = True
+            name = 'r{}'.format(len(groups))
+            groups.append('(?P<{}>{})'.format(name, pattern))
+            self.formats[name] = (color, bold)
+            self.rules.append((regex, (color, bold)))
+        self.pattern = None
+        if groups and not separate:
+            try:
+                self.pattern = re.compile('|'.join(groups))
+            except re.error:
+                pass
+        return invalids
+
+    def spans(self, seq, text):
+        """
+           returns [ (start, end, (colour, bold)) ] of the line
+        """
+        if not self.rules:
+            return ()
+        spans = self.cache.get(seq)
+        if spans is not None:
+            self.cache.move_to_end(seq)
+            return spans
+        if self.pattern is not None:
+            spans = [ (match.start(), match.end(), self.formats[match.lastgroup])
+                      for match in self.pattern.finditer(text) if match.end() > match.start() ]
+        else:
+            spans = self._spans(text)
+        self.cache[seq] = spans
+        if self.CACHE < len(self.cache):
+            self.cache.popitem(last=False)
+        return spans
+
+    def _spans(self, text):
+        # the earliest match wins, the first rule on a tie, as the combined pattern does
+        matches = sorted([ (match.start(), index, match.end(), format)
+                           for index, (regex, format) in enumerate(self.rules)
+                           for match in regex.finditer(text) if match.end() > match.start() ])
+        spans = []
+        end = 0
+        for (start, index, stop, format) in matches:
+            if end <= start:
+                spans.append((start, stop, format))
+                end = stop
+        return spans
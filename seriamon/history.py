@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from .curvebuffer import minmax, interleave
+
+class ChannelHistory:
+    """
+       all samples of a plot channel in .npy segments on disk
+
+       Samples are collected in RAM until a segment is full, then x and y are
+       saved as the two rows of one .npy file and a min/max summary of
+       SUMMARY buckets is appended to the summary file. Only the x range of
+       each segment stays in RAM. decimate() maps the segments which overlap
+       the range, segments which lie inside the range are read from their
+       summaries if those are fine enough.
+
+       If a segment can not be written the channel stops recording and keeps
+       the OSError in error, what was recorded before can still be read.
+    """
+    SEGMENT = 65536
+    SUMMARY = 256
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.error = None
+        self._xmins = []
+        self._xmaxs = []
+        self._x = np.empty(self.SEGMENT, dtype=np.float64)
+        self._y = np.empty(self.SEGMENT, dtype=np.float64)
+        self._length = 0
+        self._saved = 0
+
+    def __len__(self):
+        return self._saved + self._length
+
+    def first(self):
+        """
+           returns the x of the first sample, None if there is none
+        """
+        if self._xmins:
+            return self._xmins[0]
+        return self._x[0] if self._length else None
+
+    def extend(self, xs, ys):
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        while len(xs) and self.error is None:
+            n = min(len(xs), self.SEGMENT - self._length)
+            self._x[self._length : self._length + n] = xs[ : n]
+            self._y[self._length : self._length + n] = ys[ : n]
+            self._length += n
+            (xs, ys) = (xs[n : ], ys[n : ])
+            if self._length == self.SEGMENT:
+                self._save()
+
+    def decimate(self, x0, x1, width):
+        """
+           returns (x, y) of the samples between x0 and x1, reduced to at most
+           about 2 * width pairs of min and max if there are more samples than that
+        """
+        start = bisect_left(self._xmaxs, x0)
+        end = bisect_right(self._xmins, x1)
+        # only segments at the edges of the range are cut, their samples in the range are counted
+        edges = {}
+        for index in range(start, end):
+            if self._xmins[index] < x0 or x1 < self._xmaxs[index]:
+                edges[index] = self._load(index, x0, x1)
+        x = self._x[ : self._length]
+        y = self._y[ : self._length]
+        inRange = (x0 <= x) & (x <= x1)
+        tail = (x[inRange], y[inRange], x[inRange], y[inRange])
+        count = (end - start - len(edges)) * self.SEGMENT + len(tail[0]) \
+            + sum([ len(edge[0]) for edge in edges.values() ])
+        size = max(1, count // (2 * width))
+        summarized = self.SEGMENT // self.SUMMARY <= size
+
+        def reduce(buckets, size):
+            return buckets if size == 1 else minmax(buckets, size)
+
+        parts = []
+        inside = start
+        for index in list(range(start, end)) + [ end ]:
+            if index < end and index not in edges:
+                continue
+            # segments inside the range before this one
+            if inside < index:
+                if summarized:
+                    parts.append(minmax(self._loadSummaries(inside, index), size * self.SUMMARY // self.SEGMENT))
+                else:
+                    parts.extend([ reduce(self._load(i, x0, x1), size) for i in range(inside, index) ])
+            if index < end:
+                parts.append(reduce(edges[index], size))
+            inside = index + 1
+        parts.append(reduce(tail, size))
+
+        buckets = [ np.concatenate(columns) for columns in zip(*parts) ]
+        if size == 1:
+            return (buckets[0], buckets[1])
+        return interleave(buckets)
+
+    def _path(self, index) -> str:
+        return '{}-{:06d}.npy'.format(self.prefix, index)
+
+    def _summaryPath(self) -> str:
+        return '{}-summary.bin'.format(self.prefix)
+
+    def _save(self):
+        (x, y) = (self._x[ : self._length], self._y[ : self._length])
+        summary = np.stack(minmax((x, y, x, y), self._length // self.SUMMARY), axis=1)
+        try:
+            np.save(self._path(len(self._xmins)), np.stack((x, y)))
+            with open(self._summaryPath(), 'ab') as file:
+                file.write(summary.astype('<f8').tobytes())
+        except OSError as e:
+            # the segment which could not be written stays readable in RAM
+            self.error = e
+            return
+        self._xmins.append(float(x.min()))
+        self._xmaxs.append(float(x.max()))
+        self._saved += self._length
+        self._length = 0
+
+    def _load(self, index, x0, x1):
+        samples = np.load(self._path(index), mmap_mode='r')
+        (x, y) = (samples[0], samples[1])
+        inRange = (x0 <= x) & (x <= x1)
+        return (x[inRange], y[inRange], x[inRange], y[inRange])
+
+    def _loadSummaries(self, start, end):
+        """
+           returns (xa, ymin, xb, ymax) of the summaries of segments start to end - 1
+        """
+        record = 4 * 8
+        summaries = np.memmap(self._summaryPath(), dtype='<f8', mode='r',
+                              offset=start * self.SUMMARY * record, shape=((end - start) * self.SUMMARY, 4))
+        return tuple([ np.array(summaries[:, column]) for column in range(4) ])
+
+
+class History:
+    """
+       the directory of channel histories of a session, removed by close()
+    """
+    def __init__(self, directory=None):
+        self.path = tempfile.mkdtemp(prefix='seriamon-history-', dir=directory or None)
+        self._channels = 0
+
+    def channel(self) -> ChannelHistory:
+        self._channels += 1
+        return ChannelHistory(os.path.join(self.path, 'channel{:04d}'.format(self._channels)))
+
+    def close(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -4,13 +4,19 @@ from datetime import datetime
 from PyQt5.QtWidgets import *
 from PyQt5 import QtCore
 
+from .collapse import RepeatCollapser
 from .component import SeriaMonComponent
+from .event import LogEvent
 
 class Logger(QDialog, SeriaMonComponent):
+
+    interactive = True
+
     def __init__(self, sink, instanceId=0):
         super().__init__(sink=sink, instanceId=instanceId)
 
         self.writer = None
+        self.collapser = RepeatCollapser()
 
         self.setWindowTitle('Log settings')
 
@@ -28,6 +34,9 @@ class Logger(QDialog, SeriaMonComponent):
         self.filenameTextEdit = QLineEdit()
         self.filenameTextEdit.setMinimumWidth(width)
 
+        self.collapseCheckBox = QCheckBox('Collapse repeated lines')
+        self.collapseCheckBox.setChecked(False)
+
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         self.buttons.accepted.connect(self._onOK)
         self.buttons.rejected.connect(self._onCancel)
@@ -37,7 +46,8 @@ class Logger(QDialog, SeriaMonComponent):
         grid.addWidget(self.foldernameTextEdit, 1, 0, 1, 6)
         grid.addWidget(self.selectFolderButton, 1, 6)
         grid.addWidget(self.filenameTextEdit, 2, 0, 1, 7)
-        grid.addWidget(self.buttons, 3, 0, 1, 7, alignment=QtCore.Qt.AlignRight)
+        grid.addWidget(self.collapseCheckBox, 3, 0)
+        grid.addWidget(self.buttons, 4, 0, 1, 7, alignment=QtCore.Qt.AlignRight)
         grid.setColumnStretch(0, 1)
         self.setLayout(grid)
 
@@ -46,23 +56,57 @@ class Logger(QDialog, SeriaMonComponent):
         self.initPreferences('seriamon.logger.{}.'.format(instanceId),
                              [[ str,    'foldername', foldername, self.foldernameTextEdit ],
                               [ str,    'filename',   filename,   self.filenameTextEdit ],
-                              [ bool,   'doWrite',    False,      self.saveCheckBox ]])
+                              [ bool,   'doWrite',    False,      self.saveCheckBox ],
+                              [ bool,   'collapse',   False,      self.collapseCheckBox ]])
 
     def putLog(self, value, compId=None, types=None, timestamp=None):
-        if not types:
-            types = '_'
+        self.putLogBatch([ LogEvent(value, compId, types, LogEvent.toNs(timestamp)) ])
+
+    def putLogBatch(self, log):
         if self.writer:
-            if isinstance(value, str):
-                value = value.rstrip('\n\r')
-            if isinstance(compId, int):
-                self.writer.write('{} {:02} {} {}\n'.format(timestamp, compId, types, value))
-            else:
-                self.writer.write('{} {:2} {} {}\n'.format(timestamp, compId, types, value))
+            for event in log:
+                if self.collapse:
+                    if isinstance(event.value, str):
+                        event = event._replace(value=event.value.rstrip('\n\r'))
+                    (run, ended) = self.collapser.collapse(event)
+                    if ended:
+                        self._writeRun(ended)
+                    if run:
+                        continue
+                self._write(event.value, event.compId, event.types, event.timestamp)
             self.writer.flush()
 
+    def _writeRun(self, run):
+        # repeats are written when the run has ended, file can not be updated in place
+        self._write('{} [{}]'.format(run.value, run.annotation()), run.compId, run.types,
+                    LogEvent.toDatetime(run.last))
+
+    def _write(self, value, compId, types, timestamp):
+        timestamp = timestamp.isoformat(sep=' ', timespec='microseconds')
+        if not types:
+            types = '_'
+        if isinstance(value, str):
+            value = value.rstrip('\n\r')
+        elif isinstance(value, (bytes, bytearray)):
+            value = value.hex(' ')
+        if isinstance(compId, int):
+            self.writer.write('{} {:02} {} {}\n'.format(timestamp, compId, types, value))
+        else:
+            self.writer.write('{} {:2} {} {}\n'.format(timestamp, compId, types, value))
+
     def setupDialog(self):
         return self
 
+    def shutdown(self):
+        self._flushRuns()
+
+    def _flushRuns(self):
+        runs = self.collapser.end()
+        if self.writer:
+            for run in runs:
+                self._writeRun(run)
+            self.writer.flush()
+
     def updatePreferences(self):
         super().updatePreferences()
         self._onSaveStateChanged()
@@ -85,6 +129,8 @@ class Logger(QDialog, SeriaMonComponent):
         foldername = self.foldername
         doWrite = self.doWrite
         self.reflectFromUi()
+        if not self.collapse:
+            self._flushRuns()
         updated = self.filename != filename or self.foldername != foldername or self.doWrite != doWrite
         if updated:
             self._reopen()
@@ -104,8 +150,13 @@ class Logger(QDialog, SeriaMonComponent):
                 self.writer_filename = filename
             except Exception as e:
                 newWriter = None
-                QMessageBox.critical(self, "Error", '{}'.format(e))
+                if self.interactive:
+                    QMessageBox.critical(self, "Error", '{}'.format(e))
+                else:
+                    self.log(self.LOG_ERROR, e)
         oldWriter = self.writer
+        if oldWriter:
+            self._flushRuns()
         self.writer = newWriter
         if oldWriter:
             oldWriter.close()
@@ -178,7 +229,7 @@ class LogImporter(QDialog, SeriaMonComponent):
                         lineCount += 1
                         timestamp = datetime.strptime('{} {}'.format(terms[0], terms[1]),
                                                       '%Y-%m-%d %H:%M:%S.%f')
-                        log.append([terms[4], int(terms[2]), terms[3], timestamp])
+                        log.append(LogEvent(terms[4], int(terms[2]), terms[3], LogEvent.fromDatetime(timestamp)))
                     except Exception as e:
                         self.log(self.LOG_ERROR, e)
                         self.log(self.LOG_ERROR, 'ignore line; {}'.format(line))
@@ -0,0 +1,77 @@
+import re
+
+import numpy as np
+
+NUMBER = r'[-+]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?|[iI][nN][fF]|[nN][aA][nN])'
+_number = re.compile(NUMBER)
+
+class PlotParser:
+    """
+       converts plot lines of a port into columns of floats
+
+       A line is whitespace separated terms, a term is a number optionally
+       prefixed by 'name:'. The layout of a line, the names of its terms, is
+       detected once and compiled into a regex. Following lines of the same
+       layout are only matched by it and their terms are converted to floats
+       a whole batch at a time. Lines which are not numbers are counted in
+       malformed and dropped.
+    """
+    LAYOUTS = 16
+
+    def __init__(self):
+        self.malformed = 0
+        self._layouts = {}
+        self._layout = (None, None)
+
+    def parse(self, values, ns):
+        """
+           returns [ (names, ns, columns) ] for runs of lines of the same layout
+             ns is an array of the timestamps of the lines
+             columns is an array of shape (lines, terms)
+        """
+        segments = []
+        rows = []
+        times = []
+        (names, regex) = self._layout
+        for (value, t) in zip(values, ns):
+            match = regex.fullmatch(value) if regex is not None else None
+            if match is None:
+                layout = self._detect(value)
+                if layout is None:
+                    self.malformed += 1
+                    continue
+                if rows:
+                    segments.append(self._segment(names, times, rows))
+                    rows = []
+                    times = []
+                (names, regex) = layout
+                match = regex.fullmatch(value)
+            rows.append(match.groups())
+            times.append(t)
+        if rows:
+            segments.append(self._segment(names, times, rows))
+        self._layout = (names, regex)
+        return segments
+
+    def _detect(self, value):
+        names = []
+        for term in value.split():
+            parts = term.split(':')
+            if 2 < len(parts) or not _number.fullmatch(parts[-1]):
+                return None
+            names.append(parts[0] if len(parts) == 2 else None)
+        if len(names) == 0:
+            return None
+        names = tuple(names)
+        regex = self._layouts.get(names)
+        if regex is None:
+            terms = [ '({})'.format(NUMBER) if name is None else '{}:({})'.format(re.escape(name), NUMBER)
+                      for name in names ]
+            regex = re.compile(r'\s*' + r'\s+'.join(terms) + r'\s*')
+            if self.LAYOUTS <= len(self._layouts):
+                self._layouts.clear()
+            self._layouts[names] = regex
+        return (names, regex)
+
+    def _segment(self, names, times, rows):
+        return (names, np.array(times, dtype=np.float64), np.array(rows).astype(np.float64))
@@ -3,13 +3,21 @@ import math
 from datetime import datetime
 from PyQt5 import QtCore, QtGui
 from PyQt5.QtWidgets import *
+import numpy as np
 from guiqwt.baseplot import BasePlot
 from guiqwt.plot import CurveDialog
 from guiqwt.builder import make
 from guiqwt.curve import CurvePlot, CurveItem
 from guiqwt.styles import CurveParam, LineStyleParam
 
-from .component import SeriaMonComponent
+from .component import SeriaMonComponent, SeriaMonPort, ComponentManager
+from .curvebuffer import MinMaxPyramid
+from .event import LogEvent
+from .filter import PortFilter
+from .frames import FrameDecoder
+from .history import History
+from .plotparse import PlotParser
+from .utils import ComboBox
 
 class Plotter(QDialog, SeriaMonComponent):
     def __init__(self, sink, instanceId=0):
@@ -17,7 +25,6 @@ class Plotter(QDialog, SeriaMonComponent):
 
         self.setObjectName('Plotter')
 
-        self.MAXSAMPLES = 10000
         self.width = 600.0
         self.penColors = [
             '#0000FF', # Blue
@@ -30,6 +37,7 @@ class Plotter(QDialog, SeriaMonComponent):
             '#000000'  # Black
         ]
 
+        self.sessionHistory = None
         self._initLog()
 
         self.plot_window = CurveDialog(edit=False, toolbar=True)
@@ -41,6 +49,8 @@ class Plotter(QDialog, SeriaMonComponent):
         self.plot.add_item(self.plot_grid)
         self.plot_cursor = make.xcursor(0, 0, label='x = %.2f<br>y = %.2f')
         self.plot.add_item(self.plot_cursor)
+        # curves are decimated against the axis limits, redo it when they change
+        self.plot.SIG_PLOT_AXIS_CHANGED.connect(self._onAxisChanged)
 
         self.panScrollBar = QScrollBar(QtCore.Qt.Horizontal)
         self.panScrollBar.valueChanged.connect(self._update_panzoom)
@@ -76,12 +86,76 @@ class Plotter(QDialog, SeriaMonComponent):
         self.showToolsCheckBox.stateChanged.connect(self._update)
         self.showCursorCheckBox = QCheckBox('show cursor')
         self.showCursorCheckBox.stateChanged.connect(self._update)
+        self.maxSamplesLineEdit = QLineEdit()
+        self.maxSamplesLineEdit.setValidator(QtGui.QIntValidator(100, 100000000))
+        self.maxSamplesLineEdit.editingFinished.connect(self._update)
+        self.frameRateLineEdit = QLineEdit()
+        self.frameRateLineEdit.setValidator(QtGui.QIntValidator(1, 120))
+        self.frameRateLineEdit.editingFinished.connect(self._update)
+        self.malformedLabel = QLabel()
+        self.historyCheckBox = QCheckBox('keep history on disk')
+        self.historyCheckBox.stateChanged.connect(self._update)
+        self.historyDirectoryLineEdit = QLineEdit()
+        self.historyDirectoryLineEdit.setPlaceholderText('temporary directory')
+        self.historyDirectoryLineEdit.editingFinished.connect(self._update)
+
+        self.framePortComboBox = ComboBox()
+        self.framePortComboBox.aboutToBeShown.connect(self._updateFramePorts)
+        self.framePortComboBox.currentIndexChanged.connect(self._selectFramePort)
+        self.frameSyncLineEdit = QLineEdit()
+        self.frameChannelsLineEdit = QLineEdit()
+        self.frameChannelsLineEdit.setValidator(QtGui.QIntValidator(1, 64))
+        self.frameTypeComboBox = QComboBox()
+        for dtype in FrameDecoder.DTYPES:
+            self.frameTypeComboBox.addItem(dtype, dtype)
+        self.frameTimestampComboBox = QComboBox()
+        for timestamp in FrameDecoder.TIMESTAMPS:
+            self.frameTimestampComboBox.addItem(timestamp, timestamp)
+        self.frameEnableCheckBox = QCheckBox('plot binary frames')
+        self.frameApplyButton = QPushButton('apply')
+        self.frameApplyButton.clicked.connect(self._applyFrameLayout)
+        self.decoders = {}
+
+        # samples only mark their curves dirty, the timer draws them
+        self.replotTimer = QtCore.QTimer(self)
+        self.replotTimer.setSingleShot(True)
+        self.replotTimer.timeout.connect(self._replot)
 
         gridlayout = QGridLayout()
         gridlayout.addWidget(self.showGridCheckBox, 0, 0)
         gridlayout.addWidget(self.showLegendCheckBox, 1, 0)
         gridlayout.addWidget(self.showToolsCheckBox, 2, 0)
         gridlayout.addWidget(self.showCursorCheckBox, 3, 0)
+        samplesLayout = QHBoxLayout()
+        samplesLayout.addWidget(QLabel('samples per curve:'))
+        samplesLayout.addWidget(self.maxSamplesLineEdit)
+        # 32 bytes of CurveBuffer and about 9 bytes of its min/max levels per sample
+        samplesLayout.addWidget(QLabel('(about 41 bytes each)'))
+        samplesLayout.addWidget(QLabel('frames per second:'))
+        samplesLayout.addWidget(self.frameRateLineEdit)
+        samplesLayout.addStretch()
+        gridlayout.addLayout(samplesLayout, 4, 0)
+        framesLayout = QHBoxLayout()
+        framesLayout.addWidget(QLabel('port:'))
+        framesLayout.addWidget(self.framePortComboBox)
+        framesLayout.addWidget(self.frameEnableCheckBox)
+        framesLayout.addWidget(QLabel('sync word (hex):'))
+        framesLayout.addWidget(self.frameSyncLineEdit)
+        framesLayout.addWidget(QLabel('timestamp (us):'))
+        framesLayout.addWidget(self.frameTimestampComboBox)
+        framesLayout.addWidget(QLabel('channels:'))
+        framesLayout.addWidget(self.frameChannelsLineEdit)
+        framesLayout.addWidget(self.frameTypeComboBox)
+        framesLayout.addWidget(self.frameApplyButton)
+        framesLayout.addStretch()
+        gridlayout.addLayout(framesLayout, 5, 0)
+        historyLayout = QHBoxLayout()
+        historyLayout.addWidget(self.historyCheckBox)
+        historyLayout.addWidget(QLabel('in:'))
+        historyLayout.addWidget(self.historyDirectoryLineEdit)
+        historyLayout.addStretch()
+        gridlayout.addLayout(historyLayout, 6, 0)
+        gridlayout.addWidget(self.malformedLabel, 7, 0)
         gridlayout.setRowStretch(0, 1)
         gridlayout.setColumnStretch(0, 1)
 
@@ -92,53 +166,204 @@ class Plotter(QDialog, SeriaMonComponent):
                              [[ bool,   'showGrid',    False,  self.showGridCheckBox ],
                               [ bool,   'showLegend',  False,  self.showLegendCheckBox ],
                               [ bool,   'showTools',   False,  self.showToolsCheckBox ],
-                              [ bool,   'showCursor', False,  self.showCursorCheckBox ]])
+                              [ bool,   'showCursor', False,  self.showCursorCheckBox ],
+                              [ int,    'maxSamples', 1000000, self.maxSamplesLineEdit ],
+                              [ int,    'frameRate',  20,     self.frameRateLineEdit ],
+                              [ bool,   'history',    True,   self.historyCheckBox ],
+                              [ str,    'historyDirectory', '', self.historyDirectoryLineEdit ],
+                              [ str,    'binaryFrames', '',   None ]])  # port name=FrameDecoder.toString();...
 
         self._update()
 
     def setupWidget(self):
         return self._setupTabWidget
 
-    def putLog(self, value, compId, types, timestamp):
-        self._putLog(value, compId, types, timestamp)
+    def updatePreferences(self):
+        super().updatePreferences()
+        self._updateDecoders()
+        self._updateFramePorts()
         self._update()
 
+    def shutdown(self):
+        self._closeHistory()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._invalidate()
+        self._scheduleReplot()
+
+    def putLog(self, value, compId, types, timestamp):
+        self.putLogBatch([ LogEvent(value, compId, types, LogEvent.toNs(timestamp)) ])
+
+    def putLogBatch(self, log):
+        self._putLog(log)
+        self._scheduleReplot()
+
     def importLog(self, log):
-        for value, compId, types, timestamp in log:
-            self._putLog(value, compId=compId, types=types, timestamp=timestamp)
+        self._putLog(log)
 
         # reset pan and zoom
         self.zoomSpinBox.setValue(1.0)
         # reset cursor position
         self.plot_cursor.setVisible(False)
 
-        self._update()
-
-    def _putLog(self, value, compId, types, timestamp):
-        if 'p' not in types:
+        self._scheduleReplot()
+
+    def _putLog(self, log):
+        # lines and chunks of each port are decoded together
+        lines = {}
+        chunks = {}
+        for event in log:
+            if 'p' in event.types:
+                if event.compId not in lines:
+                    lines[event.compId] = ([], [])
+                lines[event.compId][0].append(event.value)
+                lines[event.compId][1].append(event.ns)
+            elif 'b' in event.types and event.compId in self.decoders:
+                if event.compId not in chunks:
+                    chunks[event.compId] = []
+                chunks[event.compId].append(event)
+        malformed = 0
+        for compId, (values, ns) in lines.items():
+            parser = self.parsers.get(compId)
+            if parser is None:
+                parser = self.parsers[compId] = PlotParser()
+            malformed -= parser.malformed
+            for (names, times, columns) in parser.parse(values, ns):
+                self._insert(compId, names, times / 1e9, columns)
+            malformed += parser.malformed
+        for compId, events in chunks.items():
+            decoder = self.decoders[compId]
+            malformed -= decoder.dropped
+            self._putFrames(compId, decoder, events)
+            malformed += decoder.dropped
+        if malformed:
+            self._updateMalformedLabel()
+
+    def _putFrames(self, compId, decoder, events):
+        times = []
+        columns = []
+        for event in events:
+            chunk = event.value
+            if isinstance(chunk, str):
+                # imported from a log file, see Logger._write()
+                try:
+                    chunk = bytes.fromhex(chunk)
+                except ValueError:
+                    continue
+            frames = decoder.decode(chunk, event.ns)
+            if frames is not None:
+                times.append(frames[0])
+                columns.append(frames[1])
+        if times:
+            self._insert(compId, decoder.names, np.concatenate(times) / 1e9, np.concatenate(columns))
+
+    def _updateMalformedLabel(self):
+        lines = [ '{}: {}'.format(compId, parser.malformed)
+                  for compId, parser in sorted(self.parsers.items(), key=lambda item: str(item[0]))
+                  if parser.malformed ]
+        dropped = [ '{}: {}'.format(compId, decoder.dropped)
+                    for compId, decoder in sorted(self.decoders.items()) if decoder.dropped ]
+        texts = []
+        if lines:
+            texts.append('ignored lines: {}'.format(', '.join(lines)))
+        if dropped:
+            texts.append('dropped bytes: {}'.format(', '.join(dropped)))
+        self.malformedLabel.setText('  '.join(texts))
+
+    def _getPorts(self):
+        return [ comp for comp in ComponentManager.get_instance().getComponents() if isinstance(comp, SeriaMonPort) ]
+
+    def _getFrameLayouts(self):
+        """
+           returns { port name: FrameDecoder.toString() } of binaryFrames
+           ports are saved by name, compIds change when the set of plugins changes
+        """
+        layouts = {}
+        for entry in self.binaryFrames.split(';'):
+            if '=' in entry:
+                (name, spec) = entry.split('=', 1)
+                layouts[name] = spec
+        return layouts
+
+    def _updateDecoders(self):
+        """
+           create decoders of binaryFrames, ports which have one are switched to binary
+        """
+        layouts = self._getFrameLayouts()
+        decoders = {}
+        for port in self._getPorts():
+            compId = port.getComponentId()
+            spec = layouts.get(port.getComponentName())
+            if spec is not None:
+                try:
+                    decoder = FrameDecoder.fromString(spec)
+                except ValueError as e:
+                    self.log(self.LOG_WARNING, '{}'.format(e))
+                    spec = None
+            if spec is not None:
+                current = self.decoders.get(compId)
+                if current is not None and current.toString() == decoder.toString():
+                    decoder = current
+                decoders[compId] = decoder
+        self.decoders = decoders
+        for port in self._getPorts():
+            if isinstance(port.sink, PortFilter):
+                port.sink.setBinary(port.getComponentId() in self.decoders, self)
+
+    def _updateFramePorts(self):
+        compId = self.framePortComboBox.currentData()
+        self.framePortComboBox.blockSignals(True)
+        self.framePortComboBox.clear()
+        for port in self._getPorts():
+            self.framePortComboBox.addItem('{:2d} {}'.format(port.getComponentId(), port.getComponentName()),
+                                           port.getComponentId())
+        index = self.framePortComboBox.findData(compId)
+        self.framePortComboBox.setCurrentIndex(max(0, index))
+        self.framePortComboBox.blockSignals(False)
+        self._selectFramePort()
+
+    def _selectFramePort(self):
+        compId = self.framePortComboBox.currentData()
+        decoder = self.decoders.get(compId)
+        self.frameApplyButton.setEnabled(compId is not None)
+        self.frameEnableCheckBox.setChecked(decoder is not None)
+        if decoder is None:
+            return
+        self.frameSyncLineEdit.setText(decoder.sync.hex())
+        self.frameChannelsLineEdit.setText(str(decoder.channels))
+        self.frameTypeComboBox.setCurrentIndex(self.frameTypeComboBox.findData(decoder.dtype))
+        self.frameTimestampComboBox.setCurrentIndex(self.frameTimestampComboBox.findData(decoder.timestamp))
+
+    def _applyFrameLayout(self):
+        compId = self.framePortComboBox.currentData()
+        if compId is None:
             return
-        try:
-            names = []
-            values = []
-            for term in value.split():
-                if ':' in term:
-                    name, v = term.split(':')
-                else:
-                    name = None
-                    v = term
-                v = float(v)
-                names.append(name)
-                values.append(v)
-            self._insert(compId, names, timestamp.timestamp(), values)
-        except Exception as e:
-            self.log(self.LOG_WARNING, '{}'.format(e))
-            self.log(self.LOG_WARNING, 'ignore log line: {}'.format(value))
+        name = [ port.getComponentName() for port in self._getPorts() if port.getComponentId() == compId ][0]
+        layouts = self._getFrameLayouts()
+        layouts.pop(name, None)
+        if self.frameEnableCheckBox.isChecked():
+            try:
+                decoder = FrameDecoder(self.frameSyncLineEdit.text().replace(' ', ''),
+                                       int(self.frameChannelsLineEdit.text() or 0),
+                                       self.frameTypeComboBox.currentData(),
+                                       self.frameTimestampComboBox.currentData())
+            except ValueError as e:
+                QMessageBox.critical(self, "Error", '{}'.format(e))
+                return
+            layouts[name] = decoder.toString()
+        self.binaryFrames = ';'.join([ '{}={}'.format(other, spec) for other, spec in sorted(layouts.items()) ])
+        self._updateDecoders()
 
     def clearLog(self):
         for curveList in self.curves:
             if curveList is not None:
                 self.plot.del_items(curveList)
+        self._closeHistory()
         self._initLog()
+        for decoder in self.decoders.values():
+            decoder.reset()
+        self._updateMalformedLabel()
         self._update()
 
     def _initLog(self):
@@ -147,6 +372,9 @@ class Plotter(QDialog, SeriaMonComponent):
         self.numberOfCurves = 0
         self.xmin = None
         self.xmax = None
+        self.shownXmax = None
+        self.dirtyCurves = set()
+        self.parsers = {}
 
     def _curve(self, compId, columum):
         for i in range(len(self.curves), compId + 1):
@@ -160,27 +388,30 @@ class Plotter(QDialog, SeriaMonComponent):
             curve = CurveItem(param)
             curve._seriamon_plotter_data = {}
             curve._seriamon_plotter_data['name'] = None
-            curve._seriamon_plotter_data['x'] = []
-            curve._seriamon_plotter_data['y'] = []
+            curve._seriamon_plotter_data['samples'] = MinMaxPyramid(self.maxSamples)
+            curve._seriamon_plotter_data['history'] = None
             self.plot.add_item(curve)
             self.curves[compId][columum] = curve
             self.numberOfCurves += 1
         return self.curves[compId][columum]
 
     def _insert(self, compId, names, x, y):
+        """
+           x is an array of times in seconds, y an array of values of shape (len(x), columns)
+        """
         # update epoc and x
         if not self.starttime:
-            self.starttime = x
-        x -= self.starttime
+            self.starttime = x[0]
+        x = x - self.starttime
 
         # update x range, min anx max 
-        if self.xmin is None or x < self.xmin:
-            self.xmin = x
-        if self.xmax is None or self.xmax < x:
-            self.xmax = x
+        if self.xmin is None or x.min() < self.xmin:
+            self.xmin = x.min()
+        if self.xmax is None or self.xmax < x.max():
+            self.xmax = x.max()
 
         # store values
-        for columum in range(0, len(y)):
+        for columum in range(0, y.shape[1]):
             curve = self._curve(compId, columum)
             cd = curve._seriamon_plotter_data
             if names[columum] is not None and cd['name'] != names[columum]:
@@ -188,14 +419,43 @@ class Plotter(QDialog, SeriaMonComponent):
                 cd['name'] = names[columum]
                 curve.setTitle(names[columum])
                 curve.itemChanged()
-            if self.MAXSAMPLES <= len(cd['x']):
-                cd['x'].pop(0)
-                cd['y'].pop(0)
-            cd['x'].append(x)
-            cd['y'].append(y[columum])
+            cd['samples'].extend(x, y[:, columum])
+            if cd['history'] is None and self.history:
+                cd['history'] = self._getHistory().channel()
+            history = cd['history']
+            if history is not None and history.error is None:
+                history.extend(x, y[:, columum])
+                if history.error is not None:
+                    self.log(self.LOG_ERROR, 'plot history of {}:{} stopped after {} samples: {}'.
+                             format(compId, columum, len(history), history.error))
+            self.dirtyCurves.add((compId, columum))
+
+    def _getHistory(self):
+        if self.sessionHistory is None:
+            try:
+                self.sessionHistory = History(self.historyDirectory)
+            except OSError as e:
+                self.log(self.LOG_WARNING, '{}'.format(e))
+                self.sessionHistory = History()
+        return self.sessionHistory
+
+    def _closeHistory(self):
+        if self.sessionHistory is None:
+            return
+        for curveList in self.curves:
+            for curve in curveList or []:
+                if curve is not None:
+                    curve._seriamon_plotter_data['history'] = None
+        self.sessionHistory.close()
+        self.sessionHistory = None
 
     def _update(self):
+        """
+           apply settings, called only when they have been changed
+        """
         self.reflectFromUi()
+        if not self.history:
+            self._closeHistory()
 
         # update curves
         for compId in range(0, len(self.curves)):
@@ -203,15 +463,15 @@ class Plotter(QDialog, SeriaMonComponent):
                 continue
             for columum in range(0, len(self.curves[compId])):
                 curve = self.curves[compId][columum]
-                cd = curve._seriamon_plotter_data
-                curve.set_data(cd['x'], cd['y'])
+                curve._seriamon_plotter_data['samples'].setCapacity(self.maxSamples)
+        self._invalidate()
 
         # update other itesm
         self.plot_grid.setVisible(self.showGrid)
         self.plot_legend.setVisible(self.showLegend)
         self.plot_window.get_toolbar().setVisible(self.showTools)
 
-        self._update_scroll_range()
+        self._flush()
         if self.showCursor and not self.plot_cursor.isVisible():
             xmin, xmax = self.plot.get_axis_limits(BasePlot.X_BOTTOM)
             ymin, ymax = self.plot.get_axis_limits(BasePlot.Y_LEFT)
@@ -223,6 +483,73 @@ class Plotter(QDialog, SeriaMonComponent):
         # draw plot
         self.plot.replot()
 
+    def _scheduleReplot(self):
+        if not self.dirtyCurves or self.replotTimer.isActive():
+            return
+        self.replotTimer.start(int(1000 / max(1, self.frameRate)))
+
+    def _replot(self):
+        self._flush()
+        self.plot.replot()
+
+    def _invalidate(self):
+        for compId in range(0, len(self.curves)):
+            if self.curves[compId] is None:
+                continue
+            for columum in range(0, len(self.curves[compId])):
+                self.dirtyCurves.add((compId, columum))
+
+    def _onAxisChanged(self, plot):
+        self._invalidate()
+        self._scheduleReplot()
+
+    def _flush(self):
+        """
+           hand samples of dirty curves to guiqwt, decimated to the visible range
+        """
+        if self.dirtyCurves:
+            xmin, xmax = self.plot.get_axis_limits(BasePlot.X_BOTTOM)
+            # follow the data if it is shown up to the end
+            if self.shownXmax is None or self.shownXmax <= xmax:
+                xmax = math.inf
+            width = max(100, self.plot.canvas().width())
+            shown = []
+            for (compId, columum) in self.dirtyCurves:
+                curve = self.curves[compId][columum]
+                # guiqwt keeps x and y for repaints, they must not be views of the rings
+                x, y = self._decimate(curve._seriamon_plotter_data, xmin, xmax, width)
+                curve.set_data(x, y)
+                if len(x):
+                    shown.append(x[-1])
+            if shown:
+                self.shownXmax = max(shown)
+            self.dirtyCurves = set()
+        self._update_scroll_range()
+
+    def _decimate(self, cd, xmin, xmax, width):
+        """
+           samples in RAM, and those before them from the history on disk
+           if the range begins before the samples in RAM
+        """
+        samples = cd['samples']
+        history = cd['history']
+        (x, y) = samples.view()
+        first = history.first() if history is not None else None
+        if first is None or len(x) == 0 or x[0] <= max(xmin, first):
+            return samples.decimate(xmin, xmax, width)
+        if xmax < x[0]:
+            return history.decimate(xmin, xmax, width)
+
+        # share the width by the length of both parts
+        (xmin, last) = (max(xmin, first), min(xmax, x[-1]))
+        older = max(1, min(width - 1, int(width * (x[0] - xmin) / max(last - xmin, 1e-9))))
+        (xa, ya) = history.decimate(xmin, np.nextafter(x[0], -math.inf), older)
+        (xb, yb) = samples.decimate(x[0], xmax, width - older)
+        # coarse buckets of RAM may begin before its oldest sample, the history has drawn those
+        keep = x[0] <= xb
+        (xb, yb) = (xb[keep], yb[keep])
+        return (np.concatenate((xa, xb)), np.concatenate((ya, yb)))
+
     def _update_panzoom(self):
         zoom = self.zoomSpinBox.value()
         self.zoomSlider.setValue(zoom)
@@ -233,7 +560,8 @@ class Plotter(QDialog, SeriaMonComponent):
             self.log(self.LOG_DEBUG, 'zoom={}, center={}, width={}'.format(zoom, center, width))
             self.plot.set_axis_limits(BasePlot.X_BOTTOM, center - width, center + width)
 
-        self._update_scroll_range()
+        self._invalidate()
+        self._flush()
         self.plot.replot()
 
     def _update_scroll_range(self):
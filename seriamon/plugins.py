@@ -0,0 +1,162 @@
+import os
+import ast
+import json
+import importlib
+import traceback
+
+from .component import *
+from .filter import PortFilter
+from .gpio import *
+
+class PluginLoader:
+    """
+       find plugins in the components folder without importing them
+
+       Classes exported by each module are listed by parsing its source and
+       cached in a manifest file keyed by the modification time of the module.
+       Modules are imported only when their classes are used.
+    """
+    MANIFEST_VERSION = 1
+
+    _manifest = None
+    _modules = {}
+
+    @staticmethod
+    def getFolder():
+        return os.path.join(os.path.dirname(__file__), 'components')
+
+    @staticmethod
+    def getManifestFilename():
+        return os.path.join(os.path.expanduser('~'), '.seriamon.plugins')
+
+    @staticmethod
+    def getModuleNames():
+        return sorted([x[:-3] for x in os.listdir(PluginLoader.getFolder()) if x.endswith('.py')])
+
+    @staticmethod
+    def getManifest(logger: SeriaMonComponent):
+        """
+           returns { module name: { 'mtime': t, 'gpio': [ class names ], 'component': bool } }
+        """
+        if PluginLoader._manifest is not None:
+            return PluginLoader._manifest
+        cached = {}
+        try:
+            with open(PluginLoader.getManifestFilename(), 'r') as reader:
+                data = json.load(reader)
+            if data.get('version') == PluginLoader.MANIFEST_VERSION and data.get('folder') == PluginLoader.getFolder():
+                cached = data['modules']
+        except FileNotFoundError as e:
+            pass
+        except Exception as e:
+            logger.log(logger.LOG_WARNING, 'ignore plugin manifest, {}'.format(e))
+        manifest = {}
+        for module_name in PluginLoader.getModuleNames():
+            filename = os.path.join(PluginLoader.getFolder(), module_name + '.py')
+            mtime = os.path.getmtime(filename)
+            if module_name in cached and cached[module_name]['mtime'] == mtime:
+                manifest[module_name] = cached[module_name]
+                continue
+            logger.log(logger.LOG_DEBUG, 'scan {}'.format(filename))
+            try:
+                manifest[module_name] = PluginLoader._scan(filename)
+            except Exception as e:
+                logger.log(logger.LOG_ERROR, 'failed to scan {}, {}'.format(filename, e))
+                continue
+            manifest[module_name]['mtime'] = mtime
+        if manifest != cached:
+            try:
+                with open(PluginLoader.getManifestFilename(), 'w') as writer:
+                    json.dump({ 'version': PluginLoader.MANIFEST_VERSION,
+                               'folder': PluginLoader.getFolder(),
+                               'modules': manifest }, writer, indent=1)
+            except Exception as e:
+                logger.log(logger.LOG_WARNING, 'failed to save plugin manifest, {}'.format(e))
+        PluginLoader._manifest = manifest
+        return manifest
+
+    @staticmethod
+    def importModule(module_name, logger: SeriaMonComponent = None):
+        if module_name in PluginLoader._modules:
+            return PluginLoader._modules[module_name]
+        try:
+            module = importlib.import_module('.components.' + module_name, 'seriamon')
+        except Exception as e:
+            module = None
+            if logger is None:
+                logger = ComponentManager.get_instance()
+            for line in traceback.format_exc().splitlines():
+                logger.log(logger.LOG_DEBUG, line)
+            logger.log(logger.LOG_WARNING, 'failed to import {}, {}'.format(module_name, e))
+        PluginLoader._modules[module_name] = module
+        return module
+
+    @staticmethod
+    def importClass(module_name, name, logger: SeriaMonComponent = None):
+        module = PluginLoader.importModule(module_name, logger)
+        if module is None:
+            return None
+        return getattr(module, name, None)
+
+    @staticmethod
+    def loadGpioClasses(logger: SeriaMonComponent):
+        """
+        Register plugin classes first so that components can use them
+        """
+        component_folder = PluginLoader.getFolder()
+        logger.log(logger.LOG_DEBUG, 'Load plugin classes from {}'.format(component_folder))
+        for module_name, entry in PluginLoader.getManifest(logger).items():
+            for name in entry['gpio']:
+                logger.log(logger.LOG_DEBUG, f'    add gpio {name} from {os.path.join(component_folder, module_name)}')
+                GpioManager.register_loader(name, lambda module_name=module_name, name=name:
+                                            PluginLoader.importClass(module_name, name, logger))
+
+    @staticmethod
+    def loadComponents(sink: SeriaMonComponent):
+        """
+        Create all components, each port is connected to the sink through a PortFilter
+        """
+        component_folder = PluginLoader.getFolder()
+        sink.log(sink.LOG_DEBUG, 'Load components from {}'.format(component_folder))
+        for module_name, entry in PluginLoader.getManifest(sink).items():
+            if not entry['component']:
+                continue
+            module = PluginLoader.importModule(module_name, sink)
+            if module is None:
+                continue
+            filter = PortFilter(sink=sink)
+            component = module.Component(sink=filter)
+            isport = isinstance(component, SeriaMonPort)
+            sink.log(sink.LOG_DEBUG, '    add compoment {}{} from {}'.format(component.getComponentName(), ' (port)' if isport else '', module_name))
+            if isport:
+                filter.setSource(component)
+            if 1 < component.component_default_num_of_instances:
+                component.setComponentName(component.getComponentName() + ' 0')
+            for i in range(1, component.component_default_num_of_instances):
+                if isport:
+                    filter = PortFilter(sink=sink)
+                else:
+                    filter = sink
+                sink.log(sink.LOG_DEBUG, '    add compoment {}{} from {}'.format(component.getComponentName(), ' (port)' if isport else '', module_name))
+                component = module.Component(sink=filter, instanceId=i)
+                if filter is not sink:
+                    filter.setSource(component)
+
+    @staticmethod
+    def _scan(filename):
+        with open(filename, 'r', encoding='utf-8') as reader:
+            tree = ast.parse(reader.read(), filename)
+        entry = { 'gpio': [], 'component': False }
+        for node in tree.body:
+            if not isinstance(node, ast.ClassDef):
+                continue
+            if node.name == 'Component':
+                entry['component'] = True
+            for base in node.bases:
+                if isinstance(base, ast.Attribute):
+                    base = base.attr
+                elif isinstance(base, ast.Name):
+                    base = base.id
+                if base == 'SeriaMonGpioInterface':
+                    entry['gpio'].append(node.name)
+        return entry
@@ -5,7 +5,7 @@ class Preferences(object):
     _lock = threading.Lock()
     _instance = None
 
-    __slots__ = ('scroll_buffer', 'default_log_level')
+    __slots__ = ('scroll_buffer', 'scroll_compressed', 'scroll_spill', 'default_log_level', 'refresh_rate', 'queue_policy')
 
     @staticmethod
     def getInstance():
@@ -17,3 +17,7 @@ class Preferences(object):
     def __init__(self) -> None:
         self.default_log_level = 2  # SeriaMonComponent.LOG_INFO
         self.scroll_buffer = 10000
+        self.scroll_compressed = 100000 # lines kept compressed in memory after they left scroll_buffer
+        self.scroll_spill = 1000000 # lines kept on disk after they left scroll_buffer, 0 to disable
+        self.refresh_rate = 30      # display updates per second
+        self.queue_policy = 'block' # see RingBuffer.POLICIES
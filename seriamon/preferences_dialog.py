@@ -5,6 +5,7 @@ from PyQt5.QtCore import QVariant
 
 from seriamon.preferences import Preferences
 from seriamon.component import SeriaMonComponent
+from seriamon.ringbuffer import RingBuffer
 
 class PreferencesDialog(QDialog, SeriaMonComponent, object):
     def __init__(self, sink, instanceId=0, updateAllComponentPreferences=None):
@@ -18,6 +19,15 @@ class PreferencesDialog(QDialog, SeriaMonComponent, object):
         width = self.scrollBufferTextEdit.fontMetrics().boundingRect('______').width()
         self.scrollBufferTextEdit.setMinimumWidth(width)
 
+        self.scrollCompressedTextEdit = QLineEdit()
+        self.scrollCompressedTextEdit.setMinimumWidth(width)
+
+        self.scrollSpillTextEdit = QLineEdit()
+        self.scrollSpillTextEdit.setMinimumWidth(width)
+
+        self.refreshRateTextEdit = QLineEdit()
+        self.refreshRateTextEdit.setMinimumWidth(width)
+
         self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
         self.buttons.accepted.connect(self._onOK)
         self.buttons.rejected.connect(self._onCancel)
@@ -28,19 +38,35 @@ class PreferencesDialog(QDialog, SeriaMonComponent, object):
         self.logLevelComboBox.addItem('warning', QVariant(SeriaMonComponent.LOG_WARNING))
         self.logLevelComboBox.addItem('info', QVariant(SeriaMonComponent.LOG_INFO))
         self.logLevelComboBox.addItem('debug', QVariant(SeriaMonComponent.LOG_DEBUG))
-        
+
+        self.queuePolicyComboBox = QComboBox()
+        for policy in RingBuffer.POLICIES:
+            self.queuePolicyComboBox.addItem(policy, QVariant(policy))
+
         grid = QGridLayout()
         grid.addWidget(QLabel('log level:'), 0, 0, 1, 1)
         grid.addWidget(self.logLevelComboBox, 0, 1, 1, 1)
         grid.addWidget(QLabel('scroll buffer:'), 1, 0, 1, 1)
         grid.addWidget(self.scrollBufferTextEdit, 1, 1, 1, 6)
-        grid.addWidget(self.buttons, 2, 0, 1, 7, alignment=QtCore.Qt.AlignRight)
+        grid.addWidget(QLabel('scroll buffer compressed:'), 2, 0, 1, 1)
+        grid.addWidget(self.scrollCompressedTextEdit, 2, 1, 1, 6)
+        grid.addWidget(QLabel('scroll buffer on disk:'), 3, 0, 1, 1)
+        grid.addWidget(self.scrollSpillTextEdit, 3, 1, 1, 6)
+        grid.addWidget(QLabel('refresh rate (Hz):'), 4, 0, 1, 1)
+        grid.addWidget(self.refreshRateTextEdit, 4, 1, 1, 6)
+        grid.addWidget(QLabel('when queue is full:'), 5, 0, 1, 1)
+        grid.addWidget(self.queuePolicyComboBox, 5, 1, 1, 1)
+        grid.addWidget(self.buttons, 6, 0, 1, 7, alignment=QtCore.Qt.AlignRight)
         grid.setColumnStretch(0, 1)
         self.setLayout(grid)
 
         self.initPreferences('seriamon.prefeerences.',
                              [[ int,    'scroll_buffer',     self.prefs.scroll_buffer,     self.scrollBufferTextEdit ],
-                              [ int,    'default_log_level', self.prefs.default_log_level, self.logLevelComboBox     ]
+                              [ int,    'scroll_compressed', self.prefs.scroll_compressed, self.scrollCompressedTextEdit ],
+                              [ int,    'scroll_spill',      self.prefs.scroll_spill,      self.scrollSpillTextEdit  ],
+                              [ int,    'default_log_level', self.prefs.default_log_level, self.logLevelComboBox     ],
+                              [ int,    'refresh_rate',      self.prefs.refresh_rate,      self.refreshRateTextEdit  ],
+                              [ str,    'queue_policy',      self.prefs.queue_policy,      self.queuePolicyComboBox  ]
                              ])
 
     def __setattr__(self, name, value) -> None:
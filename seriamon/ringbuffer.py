@@ -0,0 +1,144 @@
+import threading
+import pickle
+import tempfile
+from collections import deque
+
+class RingBuffer:
+    """
+       bounded buffer between the ports and the GUI
+
+       What happens when the buffer is full depends on the policy,
+         block:       wait until the GUI consumes some items
+         drop-oldest: discard the oldest item to make room
+         drop-newest: discard the item being put
+         spill:       write the item to a temporary file and read it back later
+       Dropped and spilled items are counted for each port.
+    """
+    BLOCK = 'block'
+    DROP_OLDEST = 'drop-oldest'
+    DROP_NEWEST = 'drop-newest'
+    SPILL = 'spill'
+    POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, SPILL)
+
+    def __init__(self, capacity, policy=BLOCK):
+        self._condvar = threading.Condition()
+        self._items = deque()
+        self._capacity = capacity
+        self._policy = None
+        self._spill = None
+        self._spillReadPos = 0
+        self._spillCount = 0
+        self._dropped = {}
+        self._spilled = {}
+        self._generation = 0
+        self.setPolicy(policy)
+
+    def setPolicy(self, policy):
+        if policy not in self.POLICIES:
+            raise ValueError('unknown policy {}'.format(policy))
+        with self._condvar:
+            self._policy = policy
+            self._condvar.notifyAll()
+
+    def getPolicy(self):
+        return self._policy
+
+    def getCapacity(self):
+        return self._capacity
+
+    def put(self, item, compId=None, force=False) -> bool:
+        """
+           forced items are never dropped or blocked, they keep their order
+           behind items which have been spilled
+        """
+        with self._condvar:
+            while True:
+                if force and 0 < self._spillCount:
+                    self._spillItem(item, compId, counted=False)
+                    return True
+                if force or self._spillCount == 0 and len(self._items) < self._capacity:
+                    self._items.append(item)
+                    return True
+                if self._policy == self.SPILL:
+                    self._spillItem(item, compId)
+                    return True
+                if self._policy == self.DROP_NEWEST:
+                    self._count(self._dropped, compId)
+                    return False
+                if self._policy == self.DROP_OLDEST and self._dropOldest():
+                    continue
+                if threading.current_thread() is threading.main_thread():
+                    # The GUI thread consumes the buffer. It must not wait for itself.
+                    self._items.append(item)
+                    return True
+                self._condvar.wait()
+
+    def get(self):
+        with self._condvar:
+            if len(self._items) == 0 and 0 < self._spillCount:
+                self._unspill()
+            item = self._items.popleft()
+            self._condvar.notifyAll()
+            return item
+
+    def empty(self) -> bool:
+        return len(self._items) == 0 and self._spillCount == 0
+
+    def qsize(self) -> int:
+        return len(self._items) + self._spillCount
+
+    def __len__(self):
+        return self.qsize()
+
+    def getCounters(self):
+        """
+           returns { compId: { 'dropped': n, 'spilled': n } }
+        """
+        with self._condvar:
+            counters = {}
+            for compId in set(self._dropped.keys()) | set(self._spilled.keys()):
+                counters[compId] = { 'dropped': self._dropped.get(compId, 0),
+                                     'spilled': self._spilled.get(compId, 0) }
+            return counters
+
+    def getGeneration(self) -> int:
+        """
+           incremented whenever an item is dropped or spilled
+        """
+        return self._generation
+
+    def _count(self, counters, compId):
+        counters[compId] = counters.get(compId, 0) + 1
+        self._generation += 1
+
+    # This must be called after the lock has been acquired.
+    def _dropOldest(self) -> bool:
+        # imported logs are lists put with force, they are not dropped
+        for index, item in enumerate(self._items):
+            if type(item) != list:
+                del self._items[index]
+                self._count(self._dropped, item[1])
+                return True
+        return False
+
+    # This must be called after the lock has been acquired.
+    def _spillItem(self, item, compId, counted=True):
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile(prefix='seriamon-')
+        self._spill.seek(0, 2)
+        pickle.dump(item, self._spill)
+        self._spillCount += 1
+        if counted:
+            self._count(self._spilled, compId)
+
+    # This must be called after the lock has been acquired.
+    def _unspill(self):
+        self._spill.seek(self._spillReadPos)
+        while 0 < self._spillCount and len(self._items) < self._capacity:
+            self._items.append(pickle.load(self._spill))
+            self._spillCount -= 1
+        self._spillReadPos = self._spill.tell()
+        if self._spillCount == 0:
+            self._spill.seek(0)
+            self._spill.truncate()
+            self._spillReadPos = 0
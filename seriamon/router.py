@@ -0,0 +1,105 @@
+import re
+import threading
+import traceback
+
+from .component import SeriaMonComponent
+from .utils import Util
+
+class Subscription:
+    """
+       a sink and the events it wants
+
+       The sink is a component which has putLogBatch() or a callable which
+       takes a list of LogEvents. An event matches if
+         its compId is in compIds (all ports if compIds is None)
+         and it has any of the type flags in types (any type if types is None)
+         and pattern matches its value (any value if pattern is None)
+    """
+    def __init__(self, router, sink, compIds=None, types=None, pattern=None):
+        self.router = router
+        self.sink = sink
+        self.setFilter(compIds, types, pattern)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, trace):
+        self.router.unsubscribe(self)
+
+    def setFilter(self, compIds=None, types=None, pattern=None):
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        self.compIds = None if compIds is None else frozenset(compIds)
+        self.types = types
+        self.pattern = pattern
+        self.everything = compIds is None and types is None and pattern is None
+
+    def match(self, event) -> bool:
+        if self.compIds is not None and event.compId not in self.compIds:
+            return False
+        if self.types is not None and not any([ t in event.types for t in self.types ]):
+            return False
+        if self.pattern is not None and not self.pattern.search(str(event.value)):
+            return False
+        return True
+
+    def deliver(self, batch, importing=False):
+        if not self.everything:
+            batch = [ event for event in batch if self.match(event) ]
+        if len(batch) == 0:
+            return
+        if importing and hasattr(self.sink, 'importLog'):
+            self.sink.importLog(batch)
+        elif hasattr(self.sink, 'putLogBatch'):
+            self.sink.putLogBatch(batch)
+        else:
+            self.sink(batch)
+
+
+class EventRouter:
+    """
+       deliver events from the queue to the subscribers which want them
+
+       Events are delivered on the GUI thread. Subscribers can be added and
+       removed at any time from any thread.
+    """
+    _lock = threading.Lock()
+    _instance = None
+
+    @staticmethod
+    def getInstance():
+        with EventRouter._lock:
+            if not EventRouter._instance:
+                EventRouter._instance = EventRouter()
+            return EventRouter._instance
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = ()
+
+    def subscribe(self, sink, compIds=None, types=None, pattern=None) -> Subscription:
+        subscription = Subscription(self, sink, compIds, types, pattern)
+        with self._lock:
+            self._subscriptions = self._subscriptions + (subscription, )
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple([ s for s in self._subscriptions if s is not subscription ])
+
+    def getSubscriptions(self):
+        return self._subscriptions
+
+    def dispatch(self, batch):
+        self._deliver(batch, False)
+
+    def importLog(self, log):
+        self._deliver(log, True)
+
+    def _deliver(self, batch, importing):
+        for subscription in self._subscriptions:
+            try:
+                subscription.deliver(batch, importing)
+            except Exception:
+                for line in traceback.format_exc().splitlines():
+                    Util.log(SeriaMonComponent.LOG_ERROR, line)
@@ -1,5 +1,7 @@
 import threading
-from seriamon.component import SeriaMonComponent
+from seriamon.component import SeriaMonComponent, ComponentManager
+from seriamon.router import EventRouter
+from seriamon.stats import PipelineStats
 from seriamon.utils import Util
 
 class FilterWrapper:
@@ -83,4 +85,40 @@ class ScriptRuntime:
 
     @staticmethod
     def alive():
-        return Util.thread_alive()
\ No newline at end of file
+        return Util.thread_alive()
+
+    @staticmethod
+    def queue_counters():
+        '''
+        returns { compId: { 'dropped': n, 'spilled': n } } of the queue between ports and the GUI
+        '''
+        return ComponentManager.get_instance().sink.getQueueCounters()
+
+    @staticmethod
+    def enable_stats(enable=True):
+        '''
+        start or stop collecting pipeline statistics, see stats()
+        '''
+        if enable:
+            PipelineStats.enable()
+        else:
+            PipelineStats.disable()
+
+    @staticmethod
+    def stats():
+        '''
+        returns latencies of each pipeline stage, bytes/s and lines/s of each port and queue depth
+        '''
+        return PipelineStats.snapshot()
+
+    @staticmethod
+    def subscribe(callback, compIds=None, types=None, pattern=None):
+        '''
+        call callback(events) with lists of LogEvents which match compIds, types and pattern
+        on the GUI thread, use with statement or unsubscribe() to stop
+        '''
+        return EventRouter.getInstance().subscribe(callback, compIds, types, pattern)
+
+    @staticmethod
+    def unsubscribe(subscription):
+        EventRouter.getInstance().unsubscribe(subscription)
@@ -0,0 +1,523 @@
+import mmap
+import struct
+import tempfile
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import deque, OrderedDict
+from itertools import chain
+
+from .event import LogEvent
+
+HEADER = struct.Struct('<qHHI')  # ns, length of compId, types and value
+
+def _encode(event) -> bytes:
+    compId = str(event.compId).encode()
+    types = (event.types or '').encode()
+    value = str(event.value).encode('utf-8', 'replace')
+    return HEADER.pack(event.ns, len(compId), len(types), len(value)) + compId + types + value
+
+def _decode(buffer, offset):
+    """
+       returns the LogEvent at offset and the offset of the next record
+    """
+    (ns, compIdLength, typesLength, valueLength) = HEADER.unpack_from(buffer, offset)
+    offset += HEADER.size
+    compId = bytes(buffer[offset : offset + compIdLength]).decode()
+    offset += compIdLength
+    types = bytes(buffer[offset : offset + typesLength]).decode()
+    offset += typesLength
+    value = bytes(buffer[offset : offset + valueLength]).decode('utf-8', 'replace')
+    offset += valueLength
+    if compId.lstrip('-').isdigit():
+        compId = int(compId)
+    return (LogEvent(value, compId, types, ns), offset)
+
+def _recordEnd(buffer, offset) -> int:
+    (ns, compIdLength, typesLength, valueLength) = HEADER.unpack_from(buffer, offset)
+    return offset + HEADER.size + compIdLength + typesLength + valueLength
+
+
+class CompressedBlocks:
+    """
+       LogEvents which fell out of the ring, packed into zlib-compressed blocks
+
+       Every BLOCK lines are encoded and compressed together, repetitive
+       console output shrinks to a fraction of its size as Python strings.
+       A few decompressed blocks are cached for the region being viewed or
+       searched. When more than limit lines are kept, the oldest block is
+       handed to evict(first seq, encoded records), which may spill it.
+    """
+    BLOCK = 512
+    CACHE = 8
+
+    def __init__(self, limit, evict=None):
+        self.limit = limit
+        self.evict = evict
+        self._lock = threading.Lock()
+        self._reset(0)
+
+    def __len__(self):
+        return len(self._blocks) * self.BLOCK + len(self._pending)
+
+    def first(self) -> int:
+        return self._order[0] if self._order else self._pendingFirst
+
+    def end(self) -> int:
+        return self._pendingFirst + len(self._pending)
+
+    def append(self, seq, event):
+        with self._lock:
+            if len(self) == 0:
+                self._base = self._pendingFirst = seq
+            self._pending.append(event)
+            if self.BLOCK <= len(self._pending):
+                self._pack()
+            while self.limit < len(self) and self._order:
+                self._evict()
+
+    def get(self, seq):
+        with self._lock:
+            if seq < self.first() or self.end() <= seq:
+                raise IndexError('sequence number {} is not compressed'.format(seq))
+            if self._pendingFirst <= seq:
+                return self._pending[seq - self._pendingFirst]
+            first = seq - (seq - self._base) % self.BLOCK
+            events = self._cache.get(first)
+            if events is None:
+                raw = zlib.decompress(self._blocks[first])
+                events = []
+                offset = 0
+                while offset < len(raw):
+                    (event, offset) = _decode(raw, offset)
+                    events.append(event)
+                self._cache[first] = events
+                if self.CACHE < len(self._cache):
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(first)
+            return events[seq - first]
+
+    def setLimit(self, limit):
+        with self._lock:
+            self.limit = limit
+            while self.limit < len(self) and self._order:
+                self._evict()
+
+    def drain(self):
+        """
+           evicts all blocks, returns the sequence number and the lines which have not been packed yet
+        """
+        with self._lock:
+            while self._order:
+                self._evict()
+            (first, pending) = (self._pendingFirst, self._pending)
+            self._reset(self.end())
+            return (first, pending)
+
+    def clear(self, first):
+        with self._lock:
+            self._reset(first)
+
+    # These must be called after the lock has been acquired.
+    def _reset(self, first):
+        self._blocks = {}
+        self._order = deque()
+        self._cache = OrderedDict()
+        self._pending = []
+        self._base = first
+        self._pendingFirst = first
+
+    def _pack(self):
+        raw = b''.join([ _encode(event) for event in self._pending ])
+        self._blocks[self._pendingFirst] = zlib.compress(raw)
+        self._order.append(self._pendingFirst)
+        self._pendingFirst += len(self._pending)
+        self._pending = []
+
+    def _evict(self):
+        first = self._order.popleft()
+        data = self._blocks.pop(first)
+        self._cache.pop(first, None)
+        if self.evict:
+            self.evict(first, zlib.decompress(data))
+
+
+class SpillFile:
+    """
+       LogEvents which fell out of memory, appended to a temporary file
+
+       Records are read back through a memory map and the offset of each
+       record is indexed by sequence number, so any spilled line is paged in
+       directly. At most limit lines are kept, the file is rewritten when
+       more than half of it has expired.
+    """
+    COMPACTION = 65536
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._reset(0)
+
+    def __len__(self):
+        return len(self._offsets) - self._head
+
+    def first(self) -> int:
+        return self._base + self._head
+
+    def end(self) -> int:
+        return self._base + len(self._offsets)
+
+    def append(self, seq, event):
+        self.appendRecords(seq, _encode(event))
+
+    def appendRecords(self, seq, records):
+        """
+           appends encoded records, seq is the sequence number of the first one
+        """
+        with self._lock:
+            if len(self._offsets) == self._head:
+                self._base = seq - len(self._offsets)
+            offset = 0
+            while offset < len(records):
+                self._offsets.append(self._size + offset)
+                offset = _recordEnd(records, offset)
+            self._file.write(records)
+            self._size += len(records)
+            if self.limit < len(self):
+                self._head = len(self._offsets) - self.limit
+            if self.COMPACTION <= self._head and len(self._offsets) <= self._head * 2:
+                self._compact()
+
+    def get(self, seq):
+        with self._lock:
+            if self._file.closed or seq < self.first() or self.end() <= seq:
+                raise IndexError('sequence number {} is not spilled'.format(seq))
+            index = seq - self._base
+            offset = self._offsets[index]
+            end = self._offsets[index + 1] if index + 1 < len(self._offsets) else self._size
+            if self._map is None or len(self._map) < end:
+                self._remap()
+            return _decode(self._map, offset)[0]
+
+    def setLimit(self, limit):
+        with self._lock:
+            self.limit = limit
+            if self.limit < len(self):
+                self._head = len(self._offsets) - self.limit
+
+    def clear(self, first):
+        with self._lock:
+            self._close()
+            self._reset(first)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    # These must be called after the lock has been acquired.
+    def _reset(self, first):
+        self._file = tempfile.TemporaryFile(prefix='seriamon-scrollback-')
+        self._map = None
+        self._size = 0
+        self._offsets = array('Q')
+        self._base = first
+        self._head = 0
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _remap(self):
+        self._file.flush()
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _compact(self):
+        start = self._offsets[self._head]
+        self._file.flush()
+        self._file.seek(start)
+        file = tempfile.TemporaryFile(prefix='seriamon-scrollback-')
+        while True:
+            data = self._file.read(1024 * 1024)
+            if not data:
+                break
+            file.write(data)
+        offsets = array('Q', [ offset - start for offset in self._offsets[self._head : ] ])
+        base = self._base + self._head
+        size = self._size - start
+        self._close()
+        self._file = file
+        self._map = None
+        self._size = size
+        self._offsets = offsets
+        self._base = base
+        self._head = 0
+
+
+class Scrollback:
+    """
+       fixed-capacity ring of LogEvents with stable sequence numbers
+
+       Every appended event gets the next sequence number, which never changes
+       while the event is retained. When the ring is full the oldest event is
+       overwritten, so appending costs the same regardless of the capacity.
+       Overwritten events move on to up to compressed lines in
+       CompressedBlocks and then to up to spill lines in a SpillFile, if they
+       are enabled.
+       Retained events are first() <= seq < end().
+    """
+    def __init__(self, capacity, spill=0, compressed=0):
+        self._capacity = max(1, capacity)
+        self._ring = [ None ] * self._capacity
+        self._first = 0
+        self._end = 0
+        self._spill = None
+        self._blocks = None
+        self.setSpillLimit(spill)
+        self.setCompressedLimit(compressed)
+
+    def __len__(self):
+        return self._end - self.first()
+
+    def __iter__(self):
+        for seq, event in self.items():
+            yield event
+
+    def first(self) -> int:
+        if self._spill is not None and 0 < len(self._spill):
+            return self._spill.first()
+        if self._blocks is not None and 0 < len(self._blocks):
+            return self._blocks.first()
+        return self._first
+
+    def end(self) -> int:
+        return self._end
+
+    def getCapacity(self) -> int:
+        return self._capacity
+
+    def append(self, event) -> int:
+        seq = self._end
+        if self._capacity <= seq - self._first:
+            # other threads may read while the oldest slot is overwritten, see get()
+            self._evict(self._first, self._ring[self._first % self._capacity])
+            self._first = seq - self._capacity + 1
+        self._ring[seq % self._capacity] = event
+        self._end = seq + 1
+        return seq
+
+    def get(self, seq):
+        if self._first <= seq and seq < self._end:
+            event = self._ring[seq % self._capacity]
+            if self._first <= seq:
+                return event
+        if seq < self._first:
+            blocks = self._blocks
+            if blocks is not None:
+                try:
+                    return blocks.get(seq)
+                except IndexError:
+                    pass
+            spill = self._spill
+            if spill is not None:
+                return spill.get(seq)
+        raise IndexError('sequence number {} is not retained'.format(seq))
+
+    def items(self, first=None):
+        """
+           yields (seq, event) from first or the oldest retained event
+        """
+        if first is None or first < self.first():
+            first = self.first()
+        for seq in range(first, self._end):
+            yield (seq, self.get(seq))
+
+    def setCapacity(self, capacity):
+        capacity = max(1, capacity)
+        if capacity == self._capacity:
+            return
+        first = max(self._first, self._end - capacity)
+        for seq in range(self._first, first):
+            self._evict(seq, self._ring[seq % self._capacity])
+        ring = [ None ] * capacity
+        for seq in range(first, self._end):
+            ring[seq % capacity] = self._ring[seq % self._capacity]
+        self._ring = ring
+        self._capacity = capacity
+        self._first = first
+
+    def setSpillLimit(self, limit):
+        if limit <= 0:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
+        elif self._spill is None:
+            self._spill = SpillFile(limit)
+        else:
+            self._spill.setLimit(limit)
+
+    def setCompressedLimit(self, limit):
+        if limit <= 0:
+            if self._blocks is not None:
+                (first, pending) = self._blocks.drain()
+                for seq, event in enumerate(pending, first):
+                    self._spillEvent(seq, event)
+                self._blocks = None
+        elif self._blocks is None:
+            self._blocks = CompressedBlocks(limit, self._spillRecords)
+        else:
+            self._blocks.setLimit(limit)
+
+    def clear(self):
+        # sequence numbers keep increasing, so stale references never match new events
+        self._ring = [ None ] * self._capacity
+        self._first = self._end
+        if self._blocks is not None:
+            self._blocks.clear(self._end)
+        if self._spill is not None:
+            self._spill.clear(self._end)
+
+    def close(self):
+        self._blocks = None
+        self.setSpillLimit(0)
+
+    def _evict(self, seq, event):
+        if self._blocks is not None:
+            self._blocks.append(seq, event)
+        else:
+            self._spillEvent(seq, event)
+
+    def _spillEvent(self, seq, event):
+        if self._spill is not None:
+            self._spill.append(seq, event)
+
+    def _spillRecords(self, seq, records):
+        if self._spill is not None:
+            self._spill.appendRecords(seq, records)
+
+
+class SeqIndex:
+    """
+       ascending sequence numbers of a subset of the scrollback
+
+       Sequence numbers which fell out of the scrollback are trimmed from the
+       head. The storage is compacted only after many of them accumulated, so
+       trimming is amortized O(1) per line.
+    """
+    COMPACTION = 4096
+
+    def __init__(self):
+        self._seqs = array('q')
+        self._head = 0
+
+    def __len__(self):
+        return len(self._seqs) - self._head
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if index < 0 or len(self) <= index:
+            raise IndexError('index out of range')
+        return self._seqs[self._head + index]
+
+    def append(self, seq):
+        self._seqs.append(seq)
+
+    def seqs(self) -> array:
+        return self._seqs[self._head : ]
+
+    def assign(self, indexes):
+        """
+           replaces the content with the union of the indexes
+        """
+        # timsort merges the ascending runs in C, faster than heapq.merge() in Python
+        self._seqs = array('q', sorted(chain.from_iterable([ index.seqs() for index in indexes ])))
+        self._head = 0
+
+    def bisect(self, seq) -> int:
+        """
+           returns the index of the first sequence number >= seq
+        """
+        return bisect_left(self._seqs, seq, self._head) - self._head
+
+    def trim(self, first) -> int:
+        """
+           removes sequence numbers < first and returns how many were removed
+        """
+        head = bisect_left(self._seqs, first, self._head)
+        removed = head - self._head
+        self._head = head
+        if self.COMPACTION <= head and len(self._seqs) <= head * 2:
+            self._compact(head)
+            self._head = 0
+        return removed
+
+    def clear(self):
+        self._seqs = array('q')
+        self._head = 0
+
+    def _compact(self, head):
+        del self._seqs[ : head]
+
+
+class TimeIndex(SeqIndex):
+    """
+       SeqIndex with the running maximum of the timestamps
+
+       The running maximum is sorted even if lines from different ports or
+       imports arrive out of order, so timestamps can be bisected too. It is
+       only appended to, the text view keeps one for all lines.
+    """
+    def __init__(self):
+        super().__init__()
+        self._ns = array('q')
+
+    def append(self, seq, ns):
+        if len(self._ns) and ns < self._ns[-1]:
+            ns = self._ns[-1]
+        self._seqs.append(seq)
+        self._ns.append(ns)
+
+    def bisectTime(self, ns) -> int:
+        """
+           returns the index of the first line at or after ns
+        """
+        return bisect_left(self._ns, ns, self._head) - self._head
+
+    def clear(self):
+        super().clear()
+        self._ns = array('q')
+
+    def _compact(self, head):
+        super()._compact(head)
+        del self._ns[ : head]
+
+
+class Rows:
+    """
+       events of the scrollback picked by an index, for LogView
+
+       annotations maps seq to an object which has annotation()
+    """
+    def __init__(self, scrollback, index, annotations=None):
+        self.scrollback = scrollback
+        self.index = index
+        self.annotations = annotations if annotations is not None else {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, row):
+        return self.scrollback.get(self.index[row])
+
+    def seq(self, row):
+        return self.index[row]
+
+    def annotation(self, row):
+        annotation = self.annotations.get(self.index[row])
+        return annotation.annotation() if annotation is not None else None
@@ -1,27 +1,27 @@
 import sys
 import os
-import queue
-import importlib
-import inspect
-from datetime import datetime
+import threading
 
 from PyQt5.QtWidgets import *
 from PyQt5 import QtCore
 
 from .component import *
+from .event import LogEvent
 from .plotter import Plotter
 from .text import TextViewer
 from .logger import Logger, LogImporter
-from .filter import PortFilter
+from .plugins import PluginLoader
 from .preferences_dialog import PreferencesDialog
+from .ringbuffer import RingBuffer
+from .router import EventRouter
+from .stats import PipelineStats
 from .utils import Util
-from .gpio import *
 
 class mainWindow(QMainWindow, SeriaMonComponent):
 
     serialPortSignal = QtCore.pyqtSignal(str)
 
-    def __init__(self):
+    def __init__(self, prefFilename=None, loadPlugins=True):
         self.compmgr = ComponentManager.get_instance()
         super().__init__(sink=self)
         self.compmgr.setSink(self)
@@ -32,11 +32,17 @@ class mainWindow(QMainWindow, SeriaMonComponent):
         """
            initialize properties
         """
-        self.prefFilename = os.path.join(os.path.expanduser('~'), '.seriamon.cfg')
+        if prefFilename is None:
+            prefFilename = os.path.join(os.path.expanduser('~'), '.seriamon.cfg')
+        self.prefFilename = prefFilename
         self.NUMPORTS = 4
         self.MAXQUEUESIZE = 10000
-        self.queue = queue.Queue(self.MAXQUEUESIZE)
+        self.queue = RingBuffer(self.MAXQUEUESIZE, Preferences.getInstance().queue_policy)
+        self._queueGeneration = 0
+        self._queueCounters = {}
         self.stopped = False
+        self._signalLock = threading.Lock()
+        self._signalPending = False
 
         """
            create components
@@ -50,40 +56,9 @@ class mainWindow(QMainWindow, SeriaMonComponent):
 
         self.logImporter = LogImporter(sink=self)
 
-        component_folder = os.path.join(os.path.dirname(__file__), 'components')
-        """
-        Load plugin classes first so that components can use them
-        """
-        self.log(self.LOG_DEBUG, 'Load plugin classes from {}'.format(component_folder))
-        for module_name in [x[:-3] for x in os.listdir(component_folder) if x.endswith('.py')]:
-            module = importlib.import_module('.components.' + module_name, 'seriamon')
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if issubclass(obj, SeriaMonGpioInterface) and obj is not SeriaMonGpioInterface:
-                    self.log(self.LOG_DEBUG, f'    add gpio {obj} from {os.path.join(component_folder, module_name)}')
-                    GpioManager.register(name, obj)
-
-        self.log(self.LOG_DEBUG, 'Load components from {}'.format(component_folder))
-        for module_name in [x[:-3] for x in os.listdir(component_folder) if x.endswith('.py')]:
-            module = importlib.import_module('.components.' + module_name, 'seriamon')
-            if not 'Component' in [ name for name, obj in inspect.getmembers(module, inspect.isclass) ]:
-                continue
-            filter = PortFilter(sink=self)
-            component = module.Component(sink=filter)
-            isport = isinstance(component, SeriaMonPort)
-            self.log(self.LOG_DEBUG, '    add compoment {}{} from {}'.format(component.getComponentName(), ' (port)' if isport else '', module_name))
-            if isport:
-                filter.setSource(component)
-            if 1 < component.component_default_num_of_instances:
-                component.setComponentName(component.getComponentName() + ' 0')
-            for i in range(1, component.component_default_num_of_instances):
-                if isport:
-                    sink = PortFilter(sink=self)
-                else:
-                    sink = self
-                self.log(self.LOG_DEBUG, '    add compoment {}{} from {}'.format(component.getComponentName(), ' (port)' if isport else '', module_name))
-                component = module.Component(sink=sink, instanceId=i)
-                if sink is not self:
-                    sink.setSource(component)
+        if loadPlugins:
+            PluginLoader.loadGpioClasses(self)
+            PluginLoader.loadComponents(self)
 
         """
            display components
@@ -92,6 +67,12 @@ class mainWindow(QMainWindow, SeriaMonComponent):
         self.textViewer = TextViewer(sink=self)
         self.logger = Logger(sink=self)
 
+        # the plotter draws only plot lines and binary frames, the text viewer keeps hidden ports to show them again
+        self.router = EventRouter.getInstance()
+        self.router.subscribe(self.textViewer)
+        self.router.subscribe(self.plotter, types='pb')
+        self.router.subscribe(self.logger)
+
         self.splitter = QSplitter(QtCore.Qt.Vertical)
         self.splitter.addWidget(self.plotter)
         self.splitter.addWidget(self.textViewer)
@@ -162,7 +143,13 @@ class mainWindow(QMainWindow, SeriaMonComponent):
         """
            now we are ready
         """
-        self.serialPortSignal.connect(self._handler)
+        self.refreshTimer = QtCore.QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.timeout.connect(self._handler)
+        self.serialPortSignal.connect(self._scheduleHandler)
+        with self._signalLock:
+            self._signalPending = False
+        self._notify()
         self.show()
         self.compmgr.callAllComponentsMethod('initialized')
 
@@ -197,14 +184,22 @@ class mainWindow(QMainWindow, SeriaMonComponent):
             compId = '?'
         if types is None:
             types = ''
-        if timestamp is None:
-            timestamp = datetime.now()
-        self.queue.put([value, compId, types, timestamp ])
-        self.serialPortSignal.emit('s')
+        event = LogEvent(value, compId, types, LogEvent.toNs(timestamp))
+        self.queue.put(event, compId)
+        if PipelineStats.enabled:
+            PipelineStats.addLatency('enqueue', LogEvent.now() - event.ns)
+        self._notify()
 
     def importLog(self, log):
-        self.queue.put(log)
-        self.serialPortSignal.emit('s')
+        self.queue.put(log, force=True)
+        self._notify()
+
+    def getQueueCounters(self):
+        return self.queue.getCounters()
+
+    def updatePreferences(self):
+        super().updatePreferences()
+        self.queue.setPolicy(Preferences.getInstance().queue_policy)
 
     def stopLog(self):
         self.compmgr.callAllComponentsMethod('stopLog', excludes=self)
@@ -217,21 +212,58 @@ class mainWindow(QMainWindow, SeriaMonComponent):
         self.compmgr.callAllComponentsMethod('shutdown')
         QMainWindow.closeEvent(self, event)
 
-    def _handler(self, msg):
+    def _notify(self):
+        # coalesce signal emissions, only one can be pending at a time
+        with self._signalLock:
+            if self._signalPending:
+                return
+            self._signalPending = True
+        self.serialPortSignal.emit('s')
+
+    def _scheduleHandler(self, msg):
+        if self.refreshTimer.isActive():
+            return
+        rate = max(1, Preferences.getInstance().refresh_rate)
+        self.refreshTimer.start(int(1000 / rate))
+
+    def _handler(self):
+        with self._signalLock:
+            self._signalPending = False
+        if PipelineStats.enabled:
+            PipelineStats.setQueueDepth(self.queue.qsize())
+        batch = []
         while not self.queue.empty():
             item = self.queue.get()
-            if type(item[0]) == list:
-                self.textViewer.importLog(item)
-                self.plotter.importLog(item)
-                self.logger.importLog(item)
+            if type(item) == list:
+                self._dispatch(batch)
+                batch = []
+                self.router.importLog(item)
             else:
-                value = item[0]
-                compId = item[1]
-                types = item[2]
-                timestamp = item[3]
-                self.textViewer.putLog(value, compId, types, timestamp)
-                self.plotter.putLog(value, compId, types, timestamp)
-                self.logger.putLog(value, compId, types, timestamp)
+                batch.append(item)
+        self._dispatch(batch)
+        if self._queueGeneration != self.queue.getGeneration():
+            self._queueGeneration = self.queue.getGeneration()
+            self._updateQueueStatus()
+
+    def _dispatch(self, batch):
+        if len(batch) == 0:
+            return
+        if PipelineStats.enabled:
+            PipelineStats.addLatencies('dequeue', LogEvent.now(), batch)
+        self.router.dispatch(batch)
+        if PipelineStats.enabled:
+            PipelineStats.addLatencies('render', LogEvent.now(), batch)
+
+    def _updateQueueStatus(self):
+        counters = self.queue.getCounters()
+        for compId, counter in counters.items():
+            if compId not in self._queueCounters:
+                self.log(self.LOG_WARNING, 'queue is full, {} events from port {} ({} policy)'.
+                         format('spilled' if counter['spilled'] else 'dropped', compId, self.queue.getPolicy()))
+        self._queueCounters = counters
+        dropped = sum([ counter['dropped'] for counter in counters.values() ])
+        spilled = sum([ counter['spilled'] for counter in counters.values() ])
+        self.statusBar().showMessage('queue: {} dropped, {} spilled'.format(dropped, spilled))
 
     def _onUpdatedComponent(self, component):
         statusMap = { SeriaMonComponent.STATUS_NONE:     '',
@@ -248,12 +280,12 @@ class mainWindow(QMainWindow, SeriaMonComponent):
         compData['tabs'].setTabText(compData['tabIndex'], '{} {}'.format(status, compData['name']))
 
 class SeriaMon:
-    def __init__(self):
-        pass
+    def __init__(self, prefFilename=None):
+        self.prefFilename = prefFilename
 
     def run(self):
         app = QApplication([])
-        window = mainWindow()
+        window = mainWindow(self.prefFilename)
         window.setWindowTitle('Serial Monitor')
         sys.exit(app.exec_())
 
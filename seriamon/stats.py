@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+
+class PipelineStats:
+    """
+       latency and throughput of the pipeline from the ports to the display
+
+       Latencies are measured from the time the data was read from the port,
+         filter:  decoding and line splitting in PortFilter
+         enqueue: read -> put into the queue to the GUI
+         dequeue: read -> taken from the queue by the GUI
+         render:  read -> delivered to the text viewer, plotter and logger
+       Nothing is collected unless somebody enabled it, the hooks in the
+       pipeline only test PipelineStats.enabled.
+    """
+    STAGES = ('filter', 'enqueue', 'dequeue', 'render')
+    MAXSAMPLES = 8192
+    WINDOW = 5.0  # seconds
+
+    enabled = False
+
+    _lock = threading.Lock()
+    _users = 0
+    _latencies = {}
+    _ports = {}
+    _queueDepth = 0
+    _queueDepthMax = 0
+
+    @staticmethod
+    def enable():
+        with PipelineStats._lock:
+            if PipelineStats._users == 0:
+                PipelineStats._reset()
+            PipelineStats._users += 1
+            PipelineStats.enabled = True
+
+    @staticmethod
+    def disable():
+        with PipelineStats._lock:
+            PipelineStats._users = max(0, PipelineStats._users - 1)
+            PipelineStats.enabled = 0 < PipelineStats._users
+
+    @staticmethod
+    def reset():
+        with PipelineStats._lock:
+            PipelineStats._reset()
+
+    @staticmethod
+    def addLatency(stage, ns):
+        PipelineStats._latencies[stage].append(ns)
+
+    @staticmethod
+    def addLatencies(stage, now, events):
+        PipelineStats._latencies[stage].extend([ now - event.ns for event in events ])
+
+    @staticmethod
+    def addRead(compId, nbytes, nlines):
+        samples = PipelineStats._ports.get(compId)
+        if samples is None:
+            samples = deque(maxlen=PipelineStats.MAXSAMPLES)
+            PipelineStats._ports[compId] = samples
+        samples.append((time.monotonic(), nbytes, nlines))
+
+    @staticmethod
+    def setQueueDepth(depth):
+        PipelineStats._queueDepth = depth
+        if PipelineStats._queueDepthMax < depth:
+            PipelineStats._queueDepthMax = depth
+
+    @staticmethod
+    def snapshot():
+        """
+           returns { 'stages': { stage: { 'count', 'p50', 'p99', 'max' } },  (milliseconds)
+                     'ports': { compId: { 'bytes/s', 'lines/s' } },
+                     'queue': { 'depth', 'max' } }
+        """
+        result = { 'stages': {}, 'ports': {},
+                   'queue': { 'depth': PipelineStats._queueDepth, 'max': PipelineStats._queueDepthMax } }
+        for stage in PipelineStats.STAGES:
+            # nothing is recorded before the statistics are enabled for the first time
+            samples = sorted(PipelineStats._latencies.get(stage, ()))
+            if len(samples) == 0:
+                result['stages'][stage] = { 'count': 0, 'p50': None, 'p99': None, 'max': None }
+                continue
+            result['stages'][stage] = { 'count': len(samples),
+                                        'p50': samples[len(samples) * 50 // 100] / 1e6,
+                                        'p99': samples[len(samples) * 99 // 100] / 1e6,
+                                        'max': samples[-1] / 1e6 }
+        now = time.monotonic()
+        for compId, samples in list(PipelineStats._ports.items()):
+            samples = [ sample for sample in list(samples) if now - PipelineStats.WINDOW <= sample[0] ]
+            if len(samples) == 0:
+                result['ports'][compId] = { 'bytes/s': 0.0, 'lines/s': 0.0 }
+                continue
+            period = max(now - samples[0][0], 1.0)
+            result['ports'][compId] = { 'bytes/s': sum([ sample[1] for sample in samples ]) / period,
+                                        'lines/s': sum([ sample[2] for sample in samples ]) / period }
+        return result
+
+    # This must be called after the lock has been acquired.
+    @staticmethod
+    def _reset():
+        PipelineStats._latencies = { stage: deque(maxlen=PipelineStats.MAXSAMPLES)
+                                     for stage in PipelineStats.STAGES }
+        PipelineStats._ports = {}
+        PipelineStats._queueDepth = 0
+        PipelineStats._queueDepthMax = 0
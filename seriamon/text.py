@@ -1,26 +1,349 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from datetime import datetime, time, timedelta
 from PyQt5 import QtCore
 from PyQt5.QtWidgets import *
-from PyQt5.QtGui import QTextCursor
+from PyQt5.QtGui import QPainter, QKeySequence, QColor, QFont
 
 from .component import *
+from .event import LogEvent
 from .preferences import Preferences
+from .collapse import RepeatCollapser
+from .highlight import Highlighter
+from .scrollback import Scrollback, SeqIndex, TimeIndex, Rows
+
+class LogView(QAbstractScrollArea):
+    """
+       a read-only view which lays out and paints only the visible rows
+
+       model is a sequence of LogEvents, len() and [] are all the view needs.
+       The vertical scroll bar counts rows, so appending or removing rows and
+       changing the columns only repaint the viewport.
+    """
+    MARGIN = 4
+
+    def __init__(self, model=None):
+        super().__init__()
+        self.model = model if model is not None else []
+        self.showTimestamp = True
+        self.showCompId = False
+        self.autoScroll = True
+        self.maxColumns = 0
+        self.anchor = None
+        self.cursor = None
+        self.highlighter = None
+
+        font = self.viewport().font()
+        font.setFamily("Courier New")
+        self.viewport().setFont(font)
+        self.boldFont = QFont(font)
+        self.boldFont.setBold(True)
+        self.setFocusPolicy(QtCore.Qt.StrongFocus)
+        self.verticalScrollBar().setSingleStep(1)
+
+    def setModel(self, model):
+        self.model = model
+        self.anchor = self.cursor = None
+        self.updateRows()
+
+    def setColumns(self, showTimestamp, showCompId):
+        self.showTimestamp = showTimestamp
+        self.showCompId = showCompId
+        self.updateRows()
+
+    def rowsChanged(self, removed, appended, width=0):
+        """
+           removed rows have gone from the head and appended rows were added to the tail
+           of the model, width is the longest value among the appended rows
+        """
+        scrollbar = self.verticalScrollBar()
+        value = scrollbar.value() - removed
+        if self.anchor is not None and removed:
+            self.anchor -= removed
+            self.cursor -= removed
+            if self.anchor < 0 and self.cursor < 0:
+                self.anchor = self.cursor = None
+        if self.maxColumns < width:
+            self.maxColumns = width
+        self.updateRows()
+        if removed and not self.autoScroll:
+            scrollbar.setValue(max(0, value))
+
+    def updateRows(self):
+        rows = len(self.model)
+        page = self.pageRows()
+        scrollbar = self.verticalScrollBar()
+        scrollbar.setRange(0, max(0, rows - page))
+        scrollbar.setPageStep(page)
+        if self.autoScroll:
+            scrollbar.setValue(scrollbar.maximum())
+        charWidth = self.viewport().fontMetrics().horizontalAdvance('0')
+        width = (self.prefixColumns() + self.maxColumns) * charWidth + self.MARGIN * 2
+        scrollbar = self.horizontalScrollBar()
+        scrollbar.setRange(0, max(0, width - self.viewport().width()))
+        scrollbar.setPageStep(self.viewport().width())
+        scrollbar.setSingleStep(charWidth)
+        self.viewport().update()
+
+    def pageRows(self) -> int:
+        return max(1, self.viewport().height() // self.viewport().fontMetrics().lineSpacing())
+
+    def topRow(self) -> int:
+        return self.verticalScrollBar().value()
+
+    def scrollToRow(self, row):
+        """
+           centre the view on the row
+        """
+        self.verticalScrollBar().setValue(max(0, row - self.pageRows() // 2))
+
+    def selectRow(self, row):
+        self.anchor = self.cursor = row
+        self.scrollToRow(row)
+        self.viewport().update()
+
+    def rowAt(self, y) -> int:
+        return self.topRow() + y // self.viewport().fontMetrics().lineSpacing()
+
+    def prefixColumns(self) -> int:
+        return (24 if self.showTimestamp else 0) + (3 if self.showCompId else 0)
+
+    def formatPrefix(self, event) -> str:
+        line = ''
+        if self.showTimestamp:
+            line += "{} ".format(event.timestamp.isoformat(sep=' ', timespec='milliseconds'))
+        if self.showCompId:
+            if isinstance(event.compId, int):
+                line += '{:02} '.format(event.compId)
+            else:
+                line += '{:2} '.format(event.compId)
+        return line
+
+    def formatAnnotation(self, row) -> str:
+        annotation = self.model.annotation(row) if hasattr(self.model, 'annotation') else None
+        return '  [{}]'.format(annotation) if annotation else ''
+
+    def rowText(self, row) -> str:
+        event = self.model[row]
+        return self.formatPrefix(event) + event.value + self.formatAnnotation(row)
+
+    def selectedRows(self):
+        if self.anchor is None:
+            return range(0)
+        first = max(0, min(self.anchor, self.cursor))
+        last = min(len(self.model) - 1, max(self.anchor, self.cursor))
+        return range(first, last + 1)
+
+    def copy(self):
+        lines = [ self.rowText(row) for row in self.selectedRows() ]
+        if lines:
+            QApplication.clipboard().setText('\n'.join(lines) + '\n')
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        metrics = self.viewport().fontMetrics()
+        height = metrics.lineSpacing()
+        width = self.viewport().width()
+        palette = self.viewport().palette()
+        x = self.MARGIN - self.horizontalScrollBar().value()
+        top = self.topRow()
+        selected = self.selectedRows()
+        for i in range(self.pageRows() + 1):
+            row = top + i
+            if len(self.model) <= row:
+                break
+            y = i * height
+            if row in selected:
+                painter.fillRect(0, y, width, height, palette.highlight())
+                color = palette.highlightedText().color()
+            else:
+                color = palette.text().color()
+            painter.setPen(color)
+            event = self.model[row]
+            if self.highlighter is None or not hasattr(self.model, 'seq'):
+                painter.drawText(x, y + metrics.ascent(), self.rowText(row))
+                continue
+            # highlighted spans of the value are drawn with their own pen and font
+            left = self._drawText(painter, x, y + metrics.ascent(), self.formatPrefix(event))
+            pos = 0
+            for (start, end, (spanColor, bold)) in self.highlighter.spans(self.model.seq(row), event.value):
+                left = self._drawText(painter, left, y + metrics.ascent(), event.value[pos : start])
+                painter.setPen(QColor(spanColor))
+                if bold:
+                    painter.setFont(self.boldFont)
+                left = self._drawText(painter, left, y + metrics.ascent(), event.value[start : end])
+                painter.setPen(color)
+                painter.setFont(self.viewport().font())
+                pos = end
+            left = self._drawText(painter, left, y + metrics.ascent(), event.value[pos : ])
+            self._drawText(painter, left, y + metrics.ascent(), self.formatAnnotation(row))
+
+    def _drawText(self, painter, x, y, text) -> int:
+        if not text:
+            return x
+        painter.drawText(x, y, text)
+        return x + painter.fontMetrics().horizontalAdvance(text)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.updateRows()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def mousePressEvent(self, event):
+        if event.button() == QtCore.Qt.LeftButton:
+            row = self.rowAt(event.pos().y())
+            if event.modifiers() & QtCore.Qt.ShiftModifier and self.anchor is not None:
+                self.cursor = row
+            else:
+                self.anchor = self.cursor = row
+            self.viewport().update()
+        super().mousePressEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & QtCore.Qt.LeftButton and self.anchor is not None:
+            self.cursor = self.rowAt(event.pos().y())
+            self.viewport().update()
+        super().mouseMoveEvent(event)
+
+    def keyPressEvent(self, event):
+        if event.matches(QKeySequence.Copy):
+            self.copy()
+        elif event.matches(QKeySequence.SelectAll):
+            self.anchor = 0
+            self.cursor = len(self.model) - 1
+            self.viewport().update()
+        else:
+            super().keyPressEvent(event)
+
+
+class _SearchThread(QtCore.QThread):
+    """
+       matches a pattern against the scrollback and follows new lines
+
+       Matching sequence numbers are appended to matches, which is shared with
+       the GUI thread under lock.
+    """
+    found = QtCore.pyqtSignal()
+    CHUNK = 10000
+
+    def __init__(self, scrollback, pattern):
+        super().__init__()
+        self.scrollback = scrollback
+        self.pattern = pattern
+        self.matches = SeqIndex()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stayAlive = True
+        self.scanned = scrollback.first()
+
+    def scanning(self) -> bool:
+        return self.scanned < self.scrollback.end()
+
+    def stop(self):
+        self.stayAlive = False
+        self.wakeup.set()
+        self.wait()
+
+    def run(self):
+        search = self.pattern.search
+        while self.stayAlive:
+            end = self.scrollback.end()
+            if end <= self.scanned:
+                self.wakeup.wait()
+                self.wakeup.clear()
+                continue
+            start = max(self.scanned, self.scrollback.first())
+            end = min(end, start + self.CHUNK)
+            found = []
+            for seq in range(start, end):
+                try:
+                    if search(self.scrollback.get(seq).value):
+                        found.append(seq)
+                except IndexError:
+                    pass
+            # a line overwritten while it was matched is not retained anymore
+            first = self.scrollback.first()
+            with self.lock:
+                for seq in found:
+                    if first <= seq:
+                        self.matches.append(seq)
+                self.scanned = end
+            self.found.emit()
+
+
+class HighlightDialog(QDialog):
+    NUMRULES = 8
+    COLORS = ('red', 'darkorange', 'blue', 'darkgreen', 'magenta', 'darkcyan', 'gray')
+    DEFAULTS = [[ r'(?i:\b(?:error|fail(?:ed|ure)?|fatal|panic)\b)', 'red', True ],
+                [ r'(?i:\bwarn(?:ing)?\b)', 'darkorange', False ]]
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle('Highlight rules')
+
+        self.patternTextEdits = []
+        self.colorComboBoxes = []
+        self.boldCheckBoxes = []
+        grid = QGridLayout()
+        grid.addWidget(QLabel('regex'), 0, 0)
+        grid.addWidget(QLabel('colour'), 0, 1)
+        for i in range(self.NUMRULES):
+            patternTextEdit = QLineEdit()
+            width = patternTextEdit.fontMetrics().boundingRect('_' * 40).width()
+            patternTextEdit.setMinimumWidth(width)
+            colorComboBox = QComboBox()
+            colorComboBox.setEditable(True)
+            colorComboBox.addItems(self.COLORS)
+            boldCheckBox = QCheckBox('bold')
+            grid.addWidget(patternTextEdit, i + 1, 0)
+            grid.addWidget(colorComboBox, i + 1, 1)
+            grid.addWidget(boldCheckBox, i + 1, 2)
+            self.patternTextEdits.append(patternTextEdit)
+            self.colorComboBoxes.append(colorComboBox)
+            self.boldCheckBoxes.append(boldCheckBox)
+
+        self.buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        grid.addWidget(self.buttons, self.NUMRULES + 1, 0, 1, 3, alignment=QtCore.Qt.AlignRight)
+        grid.setColumnStretch(0, 1)
+        self.setLayout(grid)
+
+    def getPreferences(self):
+        prefs = []
+        for i in range(self.NUMRULES):
+            (pattern, color, bold) = self.DEFAULTS[i] if i < len(self.DEFAULTS) else [ '', self.COLORS[0], False ]
+            prefs += [[ str,  'highlight{}_pattern'.format(i), pattern, self.patternTextEdits[i] ],
+                      [ str,  'highlight{}_color'.format(i),   color,   self.colorComboBoxes[i] ],
+                      [ bool, 'highlight{}_bold'.format(i),    bold,    self.boldCheckBoxes[i] ]]
+        return prefs
+
 
 class TextViewer(QWidget, SeriaMonComponent):
     def __init__(self, sink, instanceId=0):
         super().__init__(sink=sink, instanceId=instanceId)
 
-        self.buffer = []
-        self.last_pos = 0
+        prefs = Preferences.getInstance()
+        self.scrollback = Scrollback(prefs.scroll_buffer, prefs.scroll_spill, prefs.scroll_compressed)
+        # every retained line, lines of each (compId, internal) and the visible lines merged from them
+        self.timeIndex = TimeIndex()
+        self.indexes = {}
+        self.widths = {}
+        self.index = SeqIndex()
+        # runs of repeated lines folded into the line of seq
+        self.collapser = RepeatCollapser()
+        self.annotations = {}
+        # seqs of annotations in ascending order, runs of ports are annotated out of order
+        self.annotationSeqs = []
+        self.rows = Rows(self.scrollback, self.index, self.annotations)
         self.ignore_ui_changes = False
-        self.textEdit = QPlainTextEdit()
-        self.textEdit.setReadOnly(True)
-        doc = self.textEdit.document()
-        font = doc.defaultFont()
-        font.setFamily("Courier New")
-        doc.setDefaultFont(font)
+        self.search = None
+        self.view = LogView(self.rows)
 
         self.autoScrollCheckBox = QCheckBox('auto scroll')
         self.autoScrollCheckBox.setChecked(True)
+        self.autoScrollCheckBox.stateChanged.connect(self.display_settings_changed)
 
         self.timestampCheckBox = QCheckBox('timestamp')
         self.timestampCheckBox.setChecked(True)
@@ -34,21 +357,58 @@ class TextViewer(QWidget, SeriaMonComponent):
         self.internalMsgCheckBox.setChecked(False)
         self.internalMsgCheckBox.stateChanged.connect(self.display_settings_changed)
 
+        self.collapseCheckBox = QCheckBox('collapse repeats')
+        self.collapseCheckBox.setChecked(False)
+        self.collapseCheckBox.stateChanged.connect(self.display_settings_changed)
+
+        self.gotoTimeLineEdit = QLineEdit()
+        self.gotoTimeLineEdit.setPlaceholderText('go to time')
+        self.gotoTimeLineEdit.setToolTip('hh:mm:ss[.fff] or yyyy-mm-dd hh:mm:ss[.fff]')
+        self.gotoTimeLineEdit.returnPressed.connect(self._gotoTime)
+
+        self.findLineEdit = QLineEdit()
+        self.findLineEdit.setPlaceholderText('find (regex)')
+        self.findLineEdit.returnPressed.connect(self._find)
+        self.findPrevButton = QPushButton('prev')
+        self.findPrevButton.clicked.connect(lambda: self.findNext(backward=True))
+        self.findNextButton = QPushButton('next')
+        self.findNextButton.clicked.connect(lambda: self.findNext())
+        self.findLabel = QLabel()
+
+        self.highlighter = Highlighter()
+        self.view.highlighter = self.highlighter
+        self.highlightDialog = HighlightDialog()
+        self.highlightDialog.buttons.accepted.connect(self._onHighlightOK)
+        self.highlightDialog.buttons.rejected.connect(self._onHighlightCancel)
+        self.highlightButton = QPushButton('highlight...')
+        self.highlightButton.clicked.connect(self.highlightDialog.exec)
+
         self.initPreferences('seriamon.textviewer.{}.'.format(instanceId),
                              [[ bool,   'auto_scroll',      True,   self.autoScrollCheckBox ],
                               [ bool,   'show_timestamp',   True,   self.timestampCheckBox ],
                               [ bool,   'show_compid',      False,  self.compIdCheckBox ],
                               [ bool,   'show_internalmsg', False,  self.internalMsgCheckBox ],
-                              [ str,    'splitterState',    None    ]])
+                              [ bool,   'collapse_repeats', False,  self.collapseCheckBox ],
+                              [ str,    'splitterState',    None    ]] +
+                             self.highlightDialog.getPreferences())
 
         self.splitter = QSplitter(QtCore.Qt.Horizontal)
-        self.splitter.addWidget(self.textEdit)
+        self.splitter.addWidget(self.view)
 
         layout = QVBoxLayout()
         layout.addWidget(self.autoScrollCheckBox)
         layout.addWidget(self.timestampCheckBox)
         layout.addWidget(self.compIdCheckBox)
         layout.addWidget(self.internalMsgCheckBox)
+        layout.addWidget(self.collapseCheckBox)
+        layout.addWidget(self.highlightButton)
+        layout.addWidget(self.gotoTimeLineEdit)
+        layout.addWidget(self.findLineEdit)
+        findLayout = QHBoxLayout()
+        findLayout.addWidget(self.findPrevButton)
+        findLayout.addWidget(self.findNextButton)
+        layout.addLayout(findLayout)
+        layout.addWidget(self.findLabel)
         self.compid_checkboxes = []
         self.visible_compids = [ 0 ]
         for comp in ComponentManager.get_instance().getComponents():
@@ -71,12 +431,23 @@ class TextViewer(QWidget, SeriaMonComponent):
         layout.addWidget(self.splitter)
         self.setLayout(layout)
 
+    def updatePreferences(self):
+        prefs = Preferences.getInstance()
+        if self.scrollback.getCapacity() != prefs.scroll_buffer:
+            search = self.stopSearch()
+            self.scrollback.setCapacity(prefs.scroll_buffer)
+            self.startSearch(search)
+        self.scrollback.setSpillLimit(prefs.scroll_spill)
+        self.scrollback.setCompressedLimit(prefs.scroll_compressed)
+        super().updatePreferences()
+
     def reflectToUi(self, items=None):
         self.ignore_ui_changes = True
         super().reflectToUi(items)
         if self.splitterState:
             self.splitter.restoreState(bytearray.fromhex(self.splitterState))
         self.ignore_ui_changes = False
+        self._updateHighlighter()
         self.redraw()
 
     def reflectFromUi(self, items=None):
@@ -88,72 +459,249 @@ class TextViewer(QWidget, SeriaMonComponent):
                 self.visible_compids.append(compid)
 
     def putLog(self, value, compid=None, types=None, timestamp=None):
-        value = str(value).rstrip('\n\r')
-        if Preferences.getInstance().scroll_buffer <= len(self.buffer):
-            self.buffer = self.buffer[len(self.buffer) - Preferences.getInstance().scroll_buffer + 1 : ]
-        pos = self.append_to_textedit(timestamp, value, compid, types)
-        self.buffer.append([pos, timestamp, value, compid, types])
+        self.putLogBatch([ LogEvent(value, compid, types, LogEvent.toNs(timestamp)) ])
+
+    def putLogBatch(self, log):
+        """
+           append a batch of lines, the view is updated once per batch
+        """
+        width = 0
+        appended = 0
+        folded = 0
+        visibles = {}
+        scrollback = self.scrollback
+        timeIndex = self.timeIndex
+        for event in log:
+            if 'b' in event.types:
+                # raw chunks of binary ports are shown by the hex view
+                continue
+            value = str(event.value).rstrip('\n\r')
+            if value is not event.value:
+                event = event._replace(value=value)
+            if self.collapse_repeats:
+                run = self.collapser.collapse(event, scrollback.end())[0]
+                if run:
+                    if run.ref not in self.annotations:
+                        self.annotations[run.ref] = run
+                        insort(self.annotationSeqs, run.ref)
+                    folded += 1
+                    continue
+            seq = scrollback.append(event)
+            timeIndex.append(seq, event.ns)
+            key = (event.compId, 'i' in event.types)
+            visible = visibles.get(key)
+            if visible is None:
+                if key not in self.indexes:
+                    self.indexes[key] = SeqIndex()
+                    self.widths[key] = 0
+                visible = visibles[key] = self.is_visible(key)
+            self.indexes[key].append(seq)
+            if self.widths[key] < len(value):
+                self.widths[key] = len(value)
+            if visible:
+                self.index.append(seq)
+                appended += 1
+                if width < len(value):
+                    width = len(value)
+        # lines which fell out of the scrollback leave the indexes once per batch
+        first = scrollback.first()
+        timeIndex.trim(first)
+        for index in self.indexes.values():
+            index.trim(first)
+        removed = self.index.trim(first)
+        self._trimAnnotations(first)
+        if removed or appended:
+            self.view.rowsChanged(removed, appended, width)
+        elif folded:
+            # annotations of the visible rows may have been updated
+            self.view.viewport().update()
+        if self.search:
+            with self.search.lock:
+                self.search.matches.trim(first)
+            self.search.wakeup.set()
+
+    def importLog(self, log):
+        self.putLogBatch(log)
+
+    def _trimAnnotations(self, first):
+        head = bisect_left(self.annotationSeqs, first)
+        for seq in self.annotationSeqs[ : head]:
+            del self.annotations[seq]
+        del self.annotationSeqs[ : head]
+        self.collapser.forget(first)
 
     def clearLog(self):
-        self.buffer = []
-        self.redraw()
+        search = self.stopSearch()
+        self.scrollback.clear()
+        self.timeIndex.clear()
+        self.indexes = {}
+        self.widths = {}
+        self.index.clear()
+        self.annotations.clear()
+        self.annotationSeqs = []
+        self.collapser.end()
+        self.view.setModel(self.rows)
+        self.startSearch(search)
 
-    def append_to_textedit(self, timestamp, value, compid, types) -> int:
-        if not self.show_internalmsg and 'i' in types:
-            return self.last_pos
-        if not compid in self.visible_compids:
-            return self.last_pos
-        cursor = QTextCursor(self.textEdit.document())
-        cursor.movePosition(QTextCursor.End)
-        line = ''
-        if self.show_timestamp:
-            line += "{} ".format(timestamp.isoformat(sep=' ', timespec='milliseconds'))
-        if self.show_compid:
-            if isinstance(compid, int):
-                line += '{:02} '.format(compid)
-            else:
-                line += '{:2} '.format(compid)
-        line += value
-        line += '\n'
-        cursor.insertText(line)
-        scrollbar = self.textEdit.verticalScrollBar()
-        scrollpos = scrollbar.maximum() - scrollbar.value()
-        while Preferences.getInstance().scroll_buffer < self.textEdit.document().blockCount() - 1:
-            cursor.movePosition(QTextCursor.Start)
-            cursor.select(QTextCursor.BlockUnderCursor)
-            cursor.removeSelectedText()
-            cursor.deleteChar()
-        if self.autoScrollCheckBox.isChecked():
-            scrollpos = 1
-        scrollbar.setValue(scrollbar.maximum() - scrollpos)
-        self.last_pos = scrollbar.maximum() - 1
-        return self.last_pos
-
-    def get_index_from_pos(self, pos: int) -> int:
-        for index in range(len(self.buffer)-1, -1, -1):
-            if self.buffer[index][0] <= pos:
-                return index
-        return 0
-
-    def get_pos_from_index(self, index: int) -> int:
-        if len(self.buffer) == 0:
-            return 0
-        if len(self.buffer) <= index:
-            return self.buffer[-1][0]
-        if 0 <= index:
-            return self.buffer[index][0]
-        return 0
+    def shutdown(self):
+        self.stopSearch()
+        self.scrollback.close()
+
+    def is_visible(self, key) -> bool:
+        (compId, internal) = key
+        if internal and not self.show_internalmsg:
+            return False
+        return compId in self.visible_compids
 
     def redraw(self):
-        index = self.get_index_from_pos(self.textEdit.verticalScrollBar().value())
-        self.textEdit.clear()
-        self.last_pos = 0
-        for line in self.buffer:
-            line[0] = self.append_to_textedit(line[1], line[2], line[3], line[4])
-        self.textEdit.verticalScrollBar().setValue(self.get_pos_from_index(index))
+        # keep the line at the top of the view there
+        top = self.view.topRow()
+        anchor = self.index[top] if top < len(self.index) else None
+        first = self.scrollback.first()
+        self.timeIndex.trim(first)
+        for index in self.indexes.values():
+            index.trim(first)
+        visibles = [ key for key in self.indexes if self.is_visible(key) ]
+        self.index.assign([ self.indexes[key] for key in visibles ])
+        self.view.autoScroll = self.auto_scroll
+        self.view.maxColumns = max([ self.widths[key] for key in visibles ], default=0)
+        self.view.showTimestamp = self.show_timestamp
+        self.view.showCompId = self.show_compid
+        self.view.setModel(self.rows)
+        if anchor is not None and not self.auto_scroll:
+            self.view.verticalScrollBar().setValue(self.index.bisect(anchor))
+
+    def gotoTime(self, timestamp: datetime):
+        """
+           centre the view on the first visible line at or after the timestamp
+        """
+        if len(self.index) == 0:
+            return
+        pos = self.timeIndex.bisectTime(LogEvent.fromDatetime(timestamp))
+        seq = self.timeIndex[pos] if pos < len(self.timeIndex) else self.scrollback.end()
+        row = min(self.index.bisect(seq), len(self.index) - 1)
+        if self.auto_scroll:
+            self.autoScrollCheckBox.setChecked(False)
+        self.view.selectRow(row)
+
+    def _gotoTime(self):
+        text = self.gotoTimeLineEdit.text().strip()
+        if not text or len(self.index) == 0:
+            return
+        try:
+            timestamp = datetime.fromisoformat(text)
+        except ValueError:
+            try:
+                # time of the day of the latest line, or the day before
+                latest = self.rows[len(self.rows) - 1].timestamp
+                timestamp = datetime.combine(latest.date(), time.fromisoformat(text))
+                if latest < timestamp:
+                    timestamp -= timedelta(days=1)
+            except ValueError:
+                self.log(self.LOG_WARNING, 'invalid time: {}'.format(text))
+                return
+        self.gotoTime(timestamp)
+
+    def startSearch(self, pattern):
+        """
+           searches the scrollback for the compiled pattern on a worker thread
+        """
+        self.stopSearch()
+        if pattern is None:
+            self.findLabel.setText('')
+            return
+        self.search = _SearchThread(self.scrollback, pattern)
+        self.search.found.connect(self._updateFindLabel)
+        self.search.start()
+        self._updateFindLabel()
+
+    def stopSearch(self):
+        """
+           returns the pattern of the search which was running
+        """
+        if not self.search:
+            return None
+        search = self.search
+        self.search = None
+        search.stop()
+        return search.pattern
+
+    def findNext(self, backward=False):
+        """
+           select the next (or previous) visible line which matches the search
+        """
+        if not self.search or len(self.index) == 0:
+            return
+        row = self.view.anchor if self.view.anchor is not None else self.view.topRow()
+        row = max(0, min(row, len(self.index) - 1))
+        seq = self.index[row]
+        with self.search.lock:
+            matches = self.search.matches
+            matches.trim(self.scrollback.first())
+            i = matches.bisect(seq) - 1 if backward else matches.bisect(seq + 1)
+            while 0 <= i < len(matches):
+                event = self.scrollback.get(matches[i])
+                if self.is_visible((event.compId, 'i' in event.types)):
+                    break
+                i += -1 if backward else 1
+            else:
+                return
+            seq = matches[i]
+        if self.auto_scroll:
+            self.autoScrollCheckBox.setChecked(False)
+        self.view.selectRow(self.index.bisect(seq))
+
+    def _find(self):
+        text = self.findLineEdit.text()
+        if self.search and self.search.pattern.pattern == text:
+            self.findNext()
+            return
+        if not text:
+            self.startSearch(None)
+            return
+        try:
+            pattern = re.compile(text)
+        except re.error as e:
+            self.findLabel.setText('invalid regex')
+            self.log(self.LOG_WARNING, 'invalid regex: {}: {}'.format(text, e))
+            return
+        self.startSearch(pattern)
+        self.findNext()
+
+    def _updateFindLabel(self):
+        if not self.search:
+            return
+        with self.search.lock:
+            count = len(self.search.matches)
+        self.findLabel.setText('{} matches{}'.format(count, '...' if self.search.scanning() else ''))
+
+    def _updateHighlighter(self):
+        rules = [ (getattr(self, 'highlight{}_pattern'.format(i)),
+                   getattr(self, 'highlight{}_color'.format(i)),
+                   getattr(self, 'highlight{}_bold'.format(i))) for i in range(HighlightDialog.NUMRULES) ]
+        for pattern in self.highlighter.setRules(rules):
+            self.log(self.LOG_WARNING, 'invalid highlight regex: {}'.format(pattern))
+        self.view.viewport().update()
+
+    def _onHighlightOK(self):
+        self.reflectFromUi()
+        self._updateHighlighter()
+        self.highlightDialog.close()
+
+    def _onHighlightCancel(self):
+        self.reflectToUi()
+        self.highlightDialog.close()
 
     def display_settings_changed(self):
         if self.ignore_ui_changes:
             return
+        filter = (self.visible_compids, self.show_internalmsg)
         self.reflectFromUi()
-        self.redraw()
\ No newline at end of file
+        if filter != (self.visible_compids, self.show_internalmsg):
+            self.redraw()
+            return
+        if not self.collapse_repeats:
+            self.collapser.end()
+        # columns and auto scroll only change how the visible rows are painted
+        self.view.autoScroll = self.auto_scroll
+        self.view.setColumns(self.show_timestamp, self.show_compid)
@@ -0,0 +1,28 @@
+import unittest
+
+from seriamon.collapse import RepeatCollapser
+from seriamon.event import LogEvent
+
+class RepeatCollapserTest(unittest.TestCase):
+
+    def testRuns(self):
+        collapser = RepeatCollapser()
+        self.assertEqual(collapser.collapse(LogEvent('a', 1, '', 1), ref=10), (None, None))
+        (run, ended) = collapser.collapse(LogEvent('a', 1, '', 2))
+        self.assertEqual((run.count, run.ref, ended), (2, 10, None))
+        # other ports do not end the run
+        self.assertEqual(collapser.collapse(LogEvent('b', 2, '', 3), ref=11), (None, None))
+        collapser.collapse(LogEvent('a', 1, '', 4))
+        (run, ended) = collapser.collapse(LogEvent('c', 1, '', 5), ref=12)
+        self.assertIsNone(run)
+        self.assertEqual((ended.count, ended.first, ended.last), (3, 1, 4))
+
+    def testForget(self):
+        collapser = RepeatCollapser()
+        collapser.collapse(LogEvent('a', 1, '', 1), ref=10)
+        collapser.collapse(LogEvent('a', 1, '', 2))
+        collapser.forget(11)
+        self.assertEqual(collapser.end(), [])
+
+if __name__ == '__main__':
+    unittest.main()
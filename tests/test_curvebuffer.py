@@ -0,0 +1,85 @@
+import unittest
+
+import numpy as np
+
+from seriamon.curvebuffer import CurveBuffer, MinMaxPyramid, minmax, interleave
+
+class CurveBufferTest(unittest.TestCase):
+
+    def testWrap(self):
+        buffer = CurveBuffer(5)
+        buffer.extend(np.arange(3.0), np.arange(3.0))
+        for x in range(3, 8):
+            buffer.append(float(x), -x)
+        (x, y) = buffer.view()
+        self.assertEqual(list(x), [ 3, 4, 5, 6, 7 ])
+        self.assertEqual(list(y), [ -3, -4, -5, -6, -7 ])
+
+    def testExtendLongerThanCapacity(self):
+        buffer = CurveBuffer(4)
+        buffer.append(0.0, 0.0)
+        buffer.extend(np.arange(10.0), np.arange(10.0))
+        self.assertEqual(list(buffer.view()[0]), [ 6, 7, 8, 9 ])
+
+    def testSetCapacity(self):
+        buffer = CurveBuffer(4)
+        buffer.extend(np.arange(6.0), np.arange(6.0))
+        buffer.setCapacity(3)
+        self.assertEqual(list(buffer.view()[0]), [ 3, 4, 5 ])
+
+
+class MinMaxTest(unittest.TestCase):
+
+    def testMinmax(self):
+        x = np.arange(7.0)
+        y = np.array([ 1, 5, -2, 0, 3, 9, -4 ], dtype=np.float64)
+        (xa, ymin, xb, ymax) = minmax((x, y, x, y), 3)
+        self.assertEqual(list(ymin), [ -2, 0, -4 ])
+        self.assertEqual(list(xa), [ 2, 3, 6 ])
+        self.assertEqual(list(ymax), [ 5, 9, -4 ])
+        self.assertEqual(list(xb), [ 1, 5, 6 ])
+
+    def testInterleaveInOrderOfX(self):
+        (x, y) = interleave((np.array([ 2.0 ]), np.array([ -1.0 ]), np.array([ 1.0 ]), np.array([ 5.0 ])))
+        self.assertEqual((list(x), list(y)), ([ 1, 2 ], [ 5, -1 ]))
+
+
+class MinMaxPyramidTest(unittest.TestCase):
+
+    def setUp(self):
+        self.x = np.arange(100000.0)
+        self.y = np.sin(self.x / 100)
+        self.y[12345] = 10
+        self.y[99999] = -10
+        self.pyramid = MinMaxPyramid(50000)
+        for start in range(0, len(self.x), 777):
+            self.pyramid.extend(self.x[start : start + 777], self.y[start : start + 777])
+
+    def testDecimateKeepsSpikes(self):
+        (x, y) = self.pyramid.decimate(-np.inf, np.inf, 100)
+        self.assertLessEqual(len(x), 2 * 100 * MinMaxPyramid.FACTOR)
+        self.assertTrue(np.all(np.diff(x) >= 0))
+        self.assertEqual(y.min(), -10)
+        self.assertEqual(x[-1], 99999)
+
+    def testDecimateNarrowRangeIsRaw(self):
+        (x, y) = self.pyramid.decimate(70000, 70010, 100)
+        self.assertEqual(list(x), list(range(69999, 70012)))
+
+    def testDecimateReturnsCopies(self):
+        (x, y) = self.pyramid.decimate(99990, np.inf, 100)
+        self.pyramid.extend(np.arange(100000.0, 160000.0), np.zeros(60000))
+        self.assertEqual(x[-1], 99999)
+        self.assertEqual(y[-1], -10)
+
+    def testAppendMatchesExtend(self):
+        pyramid = MinMaxPyramid(50000)
+        for (x, y) in zip(self.x[ : 5000], self.y[ : 5000]):
+            pyramid.append(float(x), float(y))
+        other = MinMaxPyramid(50000)
+        other.extend(self.x[ : 5000], self.y[ : 5000])
+        for (a, b) in zip(pyramid.decimate(0, 5000, 50), other.decimate(0, 5000, 50)):
+            self.assertTrue(np.array_equal(a, b))
+
+if __name__ == '__main__':
+    unittest.main()
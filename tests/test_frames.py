@@ -0,0 +1,53 @@
+import struct
+import unittest
+
+import numpy as np
+
+from seriamon.frames import FrameDecoder
+
+def frame(timestamp, *values):
+    return b'\xaa\x55' + struct.pack('<I', timestamp) + struct.pack('<{}h'.format(len(values)), *values)
+
+class FrameDecoderTest(unittest.TestCase):
+
+    def testLayout(self):
+        decoder = FrameDecoder('aa55', 2, 'int16', 'uint32')
+        self.assertEqual(decoder.getFrameSize(), 2 + 4 + 2 * 2)
+        self.assertEqual(FrameDecoder.fromString(decoder.toString()).toString(), 'aa55,2,int16,uint32')
+        with self.assertRaises(ValueError):
+            FrameDecoder.fromString('aa55,0,int16,none')
+        with self.assertRaises(ValueError):
+            FrameDecoder.fromString('aa55,2')
+
+    def testSplitFramesAndResync(self):
+        decoder = FrameDecoder('aa55', 2, 'int16', 'uint32')
+        data = frame(1, 1, -1) + b'\x00\x01\x02' + frame(2, 2, -2) + frame(3, 3, -3)
+        first = decoder.decode(data[ : 7], 0)
+        self.assertIsNone(first)
+        (ns, values) = decoder.decode(data[7 : ], 0)
+        self.assertEqual(values.tolist(), [ [ 1, -1 ], [ 2, -2 ], [ 3, -3 ] ])
+        self.assertEqual(decoder.dropped, 3)
+
+    def testBrokenFrame(self):
+        decoder = FrameDecoder('aa55', 1, 'int16', 'none')
+        data = b'\xaa\x55\x01\x00' + b'\xaa\x00\x02\x00' + b'\xaa\x55\x03\x00'
+        (ns, values) = decoder.decode(data, 1000)
+        self.assertEqual(values.tolist(), [ [ 1 ], [ 3 ] ])
+        self.assertEqual(decoder.dropped, 4)
+
+    def testUint32TimestampWraps(self):
+        decoder = FrameDecoder('aa55', 1, 'int16', 'uint32')
+        start = (1 << 32) - 1000
+        (ns, values) = decoder.decode(frame(start, 0) + frame(start + 500, 1), 10 ** 9)
+        self.assertEqual(list(ns), [ 10 ** 9, 10 ** 9 + 500 * 1000 ])
+        (ns, values) = decoder.decode(frame(200, 2), 2 * 10 ** 9)
+        self.assertEqual(list(ns), [ 10 ** 9 + 1200 * 1000 ])
+
+    def testTimesWithoutTimestamp(self):
+        decoder = FrameDecoder('aa55', 1, 'int16', 'none')
+        decoder.decode(frame(0, 0)[ : 2] + b'\x00\x00', 1000)
+        (ns, values) = decoder.decode(b'\xaa\x55\x01\x00' * 4, 2000)
+        self.assertTrue(np.array_equal(ns, [ 1250, 1500, 1750, 2000 ]))
+
+if __name__ == '__main__':
+    unittest.main()
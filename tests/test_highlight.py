@@ -0,0 +1,50 @@
+import unittest
+
+from seriamon.highlight import Highlighter
+
+RED = ('red', False)
+BLUE = ('blue', True)
+
+def spans(rules, text):
+    highlighter = Highlighter()
+    invalids = highlighter.setRules([ (pattern, color, bold) for (pattern, (color, bold)) in rules ])
+    return (highlighter.spans(0, text), invalids, highlighter)
+
+class HighlighterTest(unittest.TestCase):
+
+    def testFirstRuleWins(self):
+        (result, invalids, highlighter) = spans([ ('err', RED), ('error', BLUE), ('ok', BLUE) ], 'error ok')
+        self.assertEqual(result, [ (0, 3, RED), (6, 8, BLUE) ])
+        self.assertIsNotNone(highlighter.pattern)
+
+    def testGlobalFlagsAreScoped(self):
+        # (?i) of the first rule must not make the second one case insensitive
+        (result, invalids, highlighter) = spans([ ('(?i)warn', RED), ('fail', BLUE) ], 'WARN FAIL fail')
+        self.assertEqual(result, [ (0, 4, RED), (10, 14, BLUE) ])
+        self.assertEqual(invalids, [])
+
+    def testInvalidPatternIsReported(self):
+        (result, invalids, highlighter) = spans([ ('(oops', RED), ('ok', BLUE) ], 'ok')
+        self.assertEqual(invalids, [ '(oops' ])
+        self.assertEqual(result, [ (0, 2, BLUE) ])
+
+    def testBackreferenceIsMatchedSeparately(self):
+        (result, invalids, highlighter) = spans([ (r'(\w)\1', RED), ('x', BLUE) ], 'x aa')
+        self.assertIsNone(highlighter.pattern)
+        self.assertEqual(result, [ (0, 1, BLUE), (2, 4, RED) ])
+
+    def testDuplicatedGroupNames(self):
+        (result, invalids, highlighter) = spans([ ('(?P<n>a)', RED), ('(?P<n>b)', BLUE) ], 'ab')
+        self.assertEqual(invalids, [])
+        self.assertEqual(result, [ (0, 1, RED), (1, 2, BLUE) ])
+
+    def testEarliestMatchWinsWhenSeparate(self):
+        (result, invalids, highlighter) = spans([ (r'(b)\1', RED), ('abb', BLUE) ], 'abb')
+        self.assertEqual(result, [ (0, 3, BLUE) ])
+
+    def testSpansAreCached(self):
+        (result, invalids, highlighter) = spans([ ('a', RED) ], 'a')
+        self.assertIs(highlighter.spans(0, 'ignored'), result)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from seriamon.history import ChannelHistory, History
+
+class SmallHistory(ChannelHistory):
+    SEGMENT = 1024
+    SUMMARY = 16
+
+class ChannelHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory(prefix='seriamon-test-')
+        self.history = SmallHistory(os.path.join(self.directory.name, 'channel'))
+        self.x = np.arange(20000.0)
+        self.y = np.sin(self.x / 50)
+        self.y[5] = 10
+        self.y[12345] = -10
+        self.y[19999] = 20
+        for start in range(0, len(self.x), 300):
+            self.history.extend(self.x[start : start + 300], self.y[start : start + 300])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def testLength(self):
+        self.assertEqual(len(self.history), 20000)
+        self.assertEqual(self.history.first(), 0)
+
+    def testWholeRangeUsesSummaries(self):
+        (x, y) = self.history.decimate(-np.inf, np.inf, 50)
+        # 2 * width pairs, the last buckets of the parts may add a few
+        self.assertLessEqual(len(x), 3 * 2 * 50)
+        self.assertTrue(np.all(np.diff(x) >= 0))
+        self.assertEqual((y.max(), y.min()), (20, -10))
+
+    def testNarrowRangeIsRaw(self):
+        # the range crosses the boundary of two segments
+        (x, y) = self.history.decimate(1020, 1030, 50)
+        self.assertEqual(list(x), list(range(1020, 1031)))
+        self.assertTrue(np.array_equal(y, self.y[1020 : 1031]))
+
+    def testRangeAcrossSegments(self):
+        (x, y) = self.history.decimate(500, 15000, 100)
+        self.assertTrue(np.all(np.diff(x) >= 0))
+        self.assertTrue(500 <= x[0] and x[-1] <= 15000)
+        self.assertEqual(y.min(), -10)
+        self.assertLessEqual(len(x), 3 * 2 * 100)
+
+    def testTail(self):
+        (x, y) = self.history.decimate(19990, np.inf, 50)
+        self.assertEqual(list(x), list(range(19990, 20000)))
+        self.assertEqual(y[-1], 20)
+
+    def testEmptyRange(self):
+        (x, y) = self.history.decimate(30000, 40000, 50)
+        self.assertEqual(len(x), 0)
+
+    def testWriteErrorStopsRecording(self):
+        history = SmallHistory(os.path.join(self.directory.name, 'missing', 'channel'))
+        history.extend(self.x[ : 2000], self.y[ : 2000])
+        self.assertIsInstance(history.error, OSError)
+        # the segment which could not be written is still readable
+        self.assertEqual(len(history), 1024)
+        (x, y) = history.decimate(1000, 1023, 50)
+        self.assertEqual(list(x), list(range(1000, 1024)))
+
+
+class HistoryTest(unittest.TestCase):
+
+    def testClose(self):
+        history = History()
+        channel = history.channel()
+        channel.extend(np.arange(ChannelHistory.SEGMENT + 1.0), np.zeros(ChannelHistory.SEGMENT + 1))
+        self.assertIsNone(channel.error)
+        self.assertTrue(os.listdir(history.path))
+        history.close()
+        self.assertFalse(os.path.exists(history.path))
+
+if __name__ == '__main__':
+    unittest.main()
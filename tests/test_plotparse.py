@@ -0,0 +1,31 @@
+import unittest
+
+from seriamon.plotparse import PlotParser
+
+class PlotParserTest(unittest.TestCase):
+
+    def testRunsOfLayouts(self):
+        parser = PlotParser()
+        lines = [ '1 2', ' 3  4 ', 'a:5 b:-6e1', 'a:7 b:inf', 'hello', '8 9' ]
+        segments = parser.parse(lines, range(len(lines)))
+        self.assertEqual([ names for (names, ns, columns) in segments ],
+                         [ (None, None), ('a', 'b'), (None, None) ])
+        (names, ns, columns) = segments[1]
+        self.assertEqual(list(ns), [ 2, 3 ])
+        self.assertEqual(columns.tolist(), [ [ 5, -60 ], [ 7, float('inf') ] ])
+        self.assertEqual(segments[2][2].tolist(), [ [ 8, 9 ] ])
+        self.assertEqual(parser.malformed, 1)
+
+    def testMalformed(self):
+        parser = PlotParser()
+        self.assertEqual(parser.parse([ '', '1:2:3', '1 x' ], range(3)), [])
+        self.assertEqual(parser.malformed, 3)
+
+    def testLayoutIsKeptAcrossBatches(self):
+        parser = PlotParser()
+        parser.parse([ 'x:1' ], [ 0 ])
+        (names, ns, columns) = parser.parse([ 'x:2' ], [ 1 ])[0]
+        self.assertEqual((names, columns.tolist()), (('x', ), [ [ 2 ] ]))
+
+if __name__ == '__main__':
+    unittest.main()
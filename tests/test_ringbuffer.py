@@ -0,0 +1,69 @@
+import unittest
+
+from seriamon.event import LogEvent
+from seriamon.ringbuffer import RingBuffer
+
+def event(value, compId=1):
+    return LogEvent(value, compId, '', value)
+
+def drain(buffer):
+    items = []
+    while not buffer.empty():
+        items.append(buffer.get())
+    return items
+
+class RingBufferTest(unittest.TestCase):
+
+    def testDropNewest(self):
+        buffer = RingBuffer(2, RingBuffer.DROP_NEWEST)
+        results = [ buffer.put(event(i), 1) for i in range(4) ]
+        self.assertEqual(results, [ True, True, False, False ])
+        self.assertEqual([ item.value for item in drain(buffer) ], [ 0, 1 ])
+        self.assertEqual(buffer.getCounters(), { 1: { 'dropped': 2, 'spilled': 0 } })
+
+    def testDropOldest(self):
+        buffer = RingBuffer(2, RingBuffer.DROP_OLDEST)
+        for i in range(4):
+            buffer.put(event(i, i % 2), i % 2)
+        self.assertEqual([ item.value for item in drain(buffer) ], [ 2, 3 ])
+        self.assertEqual(buffer.getCounters(), { 0: { 'dropped': 1, 'spilled': 0 },
+                                                 1: { 'dropped': 1, 'spilled': 0 } })
+
+    def testDropOldestKeepsImports(self):
+        buffer = RingBuffer(2, RingBuffer.DROP_OLDEST)
+        buffer.put([ 'imported' ], force=True)
+        for i in range(3):
+            buffer.put(event(i), 1)
+        self.assertEqual(drain(buffer), [ [ 'imported' ], event(2) ])
+
+    def testSpillKeepsOrder(self):
+        buffer = RingBuffer(2, RingBuffer.SPILL)
+        for i in range(5):
+            self.assertTrue(buffer.put(event(i), 1))
+        self.assertEqual(len(buffer), 5)
+        self.assertEqual([ item.value for item in drain(buffer) ], [ 0, 1, 2, 3, 4 ])
+        self.assertEqual(buffer.getCounters(), { 1: { 'dropped': 0, 'spilled': 3 } })
+
+    def testForcedPutStaysBehindSpilled(self):
+        buffer = RingBuffer(2, RingBuffer.SPILL)
+        for i in range(3):
+            buffer.put(event(i), 1)
+        buffer.put([ 'imported' ], force=True)
+        buffer.put(event(3), 1)
+        self.assertEqual(drain(buffer), [ event(0), event(1), event(2), [ 'imported' ], event(3) ])
+        # forced items are not counted as spilled
+        self.assertEqual(buffer.getCounters()[1]['spilled'], 2)
+
+    def testGenerationCountsLosses(self):
+        buffer = RingBuffer(1, RingBuffer.DROP_NEWEST)
+        buffer.put(event(0), 1)
+        generation = buffer.getGeneration()
+        buffer.put(event(1), 1)
+        self.assertEqual(buffer.getGeneration(), generation + 1)
+
+    def testUnknownPolicy(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(1, 'unknown')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from seriamon.event import LogEvent
+from seriamon.scrollback import Scrollback, SeqIndex, TimeIndex, CompressedBlocks
+
+def event(i):
+    return LogEvent('line {}'.format(i), i % 3, 't', 1000 + i)
+
+class ScrollbackTest(unittest.TestCase):
+
+    def testRing(self):
+        scrollback = Scrollback(4)
+        for i in range(10):
+            self.assertEqual(scrollback.append(event(i)), i)
+        self.assertEqual((scrollback.first(), scrollback.end()), (6, 10))
+        self.assertEqual(list(scrollback), [ event(i) for i in range(6, 10) ])
+        with self.assertRaises(IndexError):
+            scrollback.get(5)
+
+    def testSpill(self):
+        scrollback = Scrollback(4, spill=100)
+        for i in range(50):
+            scrollback.append(event(i))
+        self.assertEqual(scrollback.first(), 0)
+        self.assertEqual([ scrollback.get(i) for i in range(50) ], [ event(i) for i in range(50) ])
+        scrollback.close()
+
+    def testCompressedAndSpill(self):
+        block = CompressedBlocks.BLOCK
+        scrollback = Scrollback(16, spill=block * 4, compressed=block * 2)
+        count = 16 + block * 5 + 7
+        for i in range(count):
+            scrollback.append(event(i))
+        # the oldest blocks went from the compressed tier to the spill file
+        self.assertEqual(scrollback.first(), 0)
+        for seq in (0, block - 1, block * 3, block * 5 + 3, count - 17, count - 1):
+            self.assertEqual(scrollback.get(seq), event(seq))
+        scrollback.close()
+
+    def testDisableCompressedSpillsPending(self):
+        scrollback = Scrollback(4, spill=1000, compressed=1000)
+        for i in range(20):
+            scrollback.append(event(i))
+        scrollback.setCompressedLimit(0)
+        self.assertEqual([ scrollback.get(i) for i in range(20) ], [ event(i) for i in range(20) ])
+        scrollback.close()
+
+    def testClearKeepsSequenceNumbers(self):
+        scrollback = Scrollback(4, spill=10)
+        for i in range(6):
+            scrollback.append(event(i))
+        scrollback.clear()
+        self.assertEqual(len(scrollback), 0)
+        self.assertEqual(scrollback.append(event(6)), 6)
+        scrollback.close()
+
+
+class SeqIndexTest(unittest.TestCase):
+
+    def testAssignMerges(self):
+        indexes = [ SeqIndex() for i in range(3) ]
+        for seq in range(30):
+            indexes[seq % 3].append(seq)
+        index = SeqIndex()
+        index.assign(indexes[ : 2])
+        self.assertEqual(list(index.seqs()), [ seq for seq in range(30) if seq % 3 != 2 ])
+
+    def testTrim(self):
+        index = SeqIndex()
+        for seq in range(0, SeqIndex.COMPACTION * 3, 2):
+            index.append(seq)
+        self.assertEqual(index.trim(SeqIndex.COMPACTION * 2 + 1), SeqIndex.COMPACTION + 1)
+        self.assertEqual(index[0], SeqIndex.COMPACTION * 2 + 2)
+        self.assertEqual(index.bisect(SeqIndex.COMPACTION * 2 + 4), 1)
+
+    def testTimeIndexRunningMaximum(self):
+        index = TimeIndex()
+        for (seq, ns) in ((0, 10), (1, 30), (2, 20), (3, 40)):
+            index.append(seq, ns)
+        # line 2 is out of order, it is found with line 1
+        self.assertEqual(index.bisectTime(25), 1)
+        self.assertEqual(index.bisectTime(35), 3)
+        index.trim(2)
+        self.assertEqual(index.bisectTime(35), 1)
+
+if __name__ == '__main__':
+    unittest.main()